@@ -0,0 +1,36 @@
+import math
+import time
+
+# -------------------------------
+# Shared benchmark statistics
+# -------------------------------
+# Nearest-rank percentiles: the q-th percentile of n sorted samples is
+# sample ceil(n*q) (1-based), so with fewer than 100 samples p99 is the
+# maximum, never a lower sample.
+
+def nearest_rank(sorted_samples, q):
+    # n*q is rounded first so float noise (e.g. 57.00000000000001) can't
+    # push the rank up by one
+    rank = math.ceil(round(len(sorted_samples) * q, 9))
+    return sorted_samples[max(rank, 1) - 1]
+
+def percentiles(samples, elapsed=None):
+    # samples in seconds; reported in milliseconds
+    if not samples:
+        return {"count": 0}
+    s = sorted(samples)
+    pick = lambda q: round(nearest_rank(s, q) * 1000, 3)
+    out = {"count": len(s), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+           "mean_ms": round(sum(s) / len(s) * 1000, 3), "max_ms": round(s[-1] * 1000, 3)}
+    if elapsed:
+        out["per_second"] = round(len(s) / elapsed, 1)
+    return out
+
+
+def timed(fn, repeat=200):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return percentiles(samples)
@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+from bench_stats import timed
+from ledger import TradeLedger
+
+# -------------------------------
+# Trade ledger benchmark
+# -------------------------------
+# Loads N synthetic trades through the batched writer, then times the
+# queries the dashboard serves: keyset pages, token/action/time filters
+# and the aggregate P&L reads.
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite trade ledger")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--wallets", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--db", help="Ledger path (default: a temp file)")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench_trades.db")
+    ledger = TradeLedger(path, batch_size=args.batch)
+    rng = random.Random(42)
+    tokens = [f"TOK{i:05d}" for i in range(args.tokens)]
+    wallets = [f"Wallet{i:03d}" for i in range(args.wallets)]
+    start_ts = time.time() - 90 * 86400
+    step = 90 * 86400 / args.rows
+
+    t = time.perf_counter()
+    for i in range(args.rows):
+        ledger.record(start_ts + i * step, rng.choice(tokens), rng.choice(("Buy", "Sell")),
+                      round(rng.uniform(50, 800), 2), round(rng.uniform(-5, 8), 2), rng.choice(wallets), "bench")
+    ledger.flush()
+    insert_s = time.perf_counter() - t
+
+    mid = start_ts + 45 * 86400
+    _, cursor = ledger.query(limit=50)
+    results = {
+        "rows": args.rows,
+        "insert_seconds": round(insert_s, 2),
+        "inserts_per_second": round(args.rows / insert_s),
+        "db_bytes": os.path.getsize(path),
+        "queries": {
+            "latest_page": timed(lambda: ledger.query(limit=50)),
+            "next_page": timed(lambda: ledger.query(cursor=cursor, limit=50)),
+            "by_token": timed(lambda: ledger.query(token=rng.choice(tokens), limit=50)),
+            "by_action": timed(lambda: ledger.query(action="Sell", limit=50)),
+            "time_range": timed(lambda: ledger.query(start=mid, end=mid + 3600, limit=50)),
+            "token_in_range": timed(lambda: ledger.query(token=rng.choice(tokens), start=mid, end=mid + 86400)),
+            "wallet_pnl": timed(ledger.wallet_pnl),
+            "token_pnl_one": timed(lambda: ledger.token_pnl(rng.choice(tokens))),
+            "token_pnl_top": timed(ledger.token_pnl),
+            "totals": timed(ledger.totals),
+        },
+    }
+    ledger.close()
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+from bench_stats import percentiles
+from stubs import StubConfig, dexscreener_stub, rpc_stub
+
+# -------------------------------
+# Dashboard benchmark harness
+# -------------------------------
+# Starts Dexscreener/RPC stand-ins, boots the dashboard against them with a
+# throwaway config (journal and ledger live in a temp dir), then measures:
+#   routes   - many concurrent dashboard clients polling the API
+#   pipeline - the rug-check sweep, stage by stage, at each upstream latency
+# Results are written as JSON; --compare flags regressions against an
+# earlier run.
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, ok=True):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed=None):
+        return {name: dict(percentiles(v, elapsed), errors=self.errors.get(name, 0))
+                for name, v in sorted(self.samples.items())}
+
+
+def boot_dashboard(tmp, args, dex, rpc):
+    cfg = {
+        "RPC_URL": rpc.url,
+        "DEXSCREENER_URL": f"{dex.url}/latest/dex/tokens",
+        "DEMO_MODE": True,
+        "TOKENS": [f"Bench{i:06d}So1111111111111111111111111" for i in range(args.tokens)],
+        "JOURNAL_FILE": os.path.join(tmp, "events.jsonl"),
+        "LEDGER_FILE": os.path.join(tmp, "trades.db"),
+    }
+    if not args.keep_rate_limits:
+        cfg["DEXSCREENER_RATE"] = cfg["RPC_RATE"] = 1_000_000
+    with open(os.path.join(tmp, "config.json"), "w") as f:
+        json.dump(cfg, f)
+    os.environ["AXIOM_CONFIG"] = os.path.join(tmp, "config.json")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    import dashboard
+    return dashboard
+
+
+# ---- routes ----
+def dashboard_client(base, deadline, rec, think):
+    # Mimics one open index page (delta polling) plus the settings page
+    http = requests.Session()
+    cursors = {"/get_trades": None, "/get_logs": None}
+    etags = {}
+    n = 0
+    while time.monotonic() < deadline:
+        paths = ["/get_trades", "/get_logs", "/get_wallets"] + (["/tokens"] if n % 5 == 0 else [])
+        for path in paths:
+            url = base + path
+            if cursors.get(path) is not None:
+                url += f"?since={cursors[path]}"
+            headers = {"If-None-Match": etags[path]} if path in etags else {}
+            t = time.perf_counter()
+            try:
+                r = http.get(url, headers=headers, timeout=30)
+                ok = r.status_code in (200, 304)
+            except requests.RequestException:
+                rec.add(path, time.perf_counter() - t, ok=False)
+                continue
+            rec.add(path, time.perf_counter() - t, ok)
+            if "X-Seq" in r.headers:
+                cursors[path] = int(r.headers["X-Seq"])
+            if "ETag" in r.headers:
+                etags[path] = r.headers["ETag"]
+        n += 1
+        if think:
+            time.sleep(think)
+
+
+def run_routes(d, args):
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", 0, d.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    if args.with_bot:
+        d.bot_status["running"] = d.sniper_status["enabled"] = True
+        d.scheduler.start_job("bot")
+        d.scheduler.start_job("sniper")
+
+    rec = Recorder()
+    deadline = time.monotonic() + args.duration
+    started = time.monotonic()
+    clients = [threading.Thread(target=dashboard_client, args=(base, deadline, rec, args.think_ms / 1000))
+               for _ in range(args.clients)]
+    for c in clients:
+        c.start()
+    for c in clients:
+        c.join()
+    elapsed = time.monotonic() - started
+
+    d.bot_status["running"] = d.sniper_status["enabled"] = False
+    d.scheduler.stop_job("bot")
+    d.scheduler.stop_job("sniper")
+    server.shutdown()
+    return rec.report(elapsed)
+
+
+# ---- pipeline ----
+def instrument(d, rec):
+    def timed(name, fn):
+        def wrapper(*a, **kw):
+            t = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                rec.add(name, time.perf_counter() - t)
+        return wrapper
+    d.scanner.fetch_batch = timed("dexscreener_batch", d.scanner.fetch_batch)
+    d.holder_percents = timed("holder_lookup", d.holder_percents)
+    d.rug_check_batch = timed("rug_check_batch", d.rug_check_batch)
+
+
+def run_pipeline(d, args, dex_cfg, rpc_cfg):
+    # Wait for jobs from the routes phase to wind down
+    while d.scheduler.snapshot()["busy_workers"]:
+        time.sleep(0.1)
+    results = {}
+    for latency in args.latency_levels:
+        dex_cfg.latency_ms = rpc_cfg.latency_ms = latency
+        rec = Recorder()
+        saved = (d.scanner.fetch_batch, d.holder_percents, d.rug_check_batch)
+        instrument(d, rec)
+        passed = 0
+        for _ in range(args.sweeps):
+            d.token_cache.invalidate()
+            d.rpc.invalidate()
+            t = time.perf_counter()
+            passed += sum(1 for _ in d.scan_watchlist("Bench"))
+            rec.add("full_sweep", time.perf_counter() - t)
+        d.scanner.fetch_batch, d.holder_percents, d.rug_check_batch = saved
+        report = rec.report()
+        sweep_s = report["full_sweep"]["mean_ms"] / 1000
+        report["tokens_per_second"] = round(args.tokens / sweep_s, 1) if sweep_s else None
+        report["pass_rate"] = round(passed / (args.tokens * args.sweeps), 4)
+        results[f"upstream_{latency:g}ms"] = report
+    return results
+
+
+# ---- comparison ----
+def flatten(results):
+    out = {}
+    for route, s in results.get("routes", {}).items():
+        out[f"routes.{route}.p95_ms"] = s.get("p95_ms")
+        out[f"routes.{route}.per_second"] = s.get("per_second")
+    for level, stages in results.get("pipeline", {}).items():
+        for stage, s in stages.items():
+            if isinstance(s, dict):
+                out[f"pipeline.{level}.{stage}.p95_ms"] = s.get("p95_ms")
+        out[f"pipeline.{level}.tokens_per_second"] = stages.get("tokens_per_second")
+    return {k: v for k, v in out.items() if v}
+
+
+def compare(current, baseline, threshold):
+    cur, base = flatten(current), flatten(baseline)
+    regressions = []
+    for key in sorted(cur.keys() & base.keys()):
+        higher_is_better = key.endswith("per_second")
+        change = (cur[key] - base[key]) / base[key]
+        worse = -change if higher_is_better else change
+        flag = "REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(key)
+        print(f"{key:60s} {base[key]:>12} -> {cur[key]:>12} ({change:+.1%}) {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard against local stand-in upstreams")
+    parser.add_argument("--tokens", type=int, default=300, help="Watchlist size")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent dashboard clients")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds of client load")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pause between client poll rounds")
+    parser.add_argument("--no-bot", dest="with_bot", action="store_false",
+                        help="Don't run the bot/sniper jobs during client load")
+    parser.add_argument("--sweeps", type=int, default=5, help="Pipeline sweeps per latency level")
+    parser.add_argument("--latency-levels", type=float, nargs="+", default=[0, 50, 200],
+                        help="Upstream latencies (ms) to measure the pipeline at")
+    parser.add_argument("--dex-latency-ms", type=float, default=20)
+    parser.add_argument("--rpc-latency-ms", type=float, default=10)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-pairs", type=int, default=1, help="Pairs returned per token")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep the production token buckets")
+    parser.add_argument("--skip-routes", action="store_true")
+    parser.add_argument("--skip-pipeline", action="store_true")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    dex_cfg = StubConfig(args.dex_latency_ms, args.jitter_ms, args.error_rate, payload_pairs=args.payload_pairs)
+    rpc_cfg = StubConfig(args.rpc_latency_ms, args.jitter_ms, args.error_rate, payload_pairs=args.payload_pairs)
+    dex = dexscreener_stub(dex_cfg).start()
+    rpc = rpc_stub(rpc_cfg).start()
+    tmp = tempfile.mkdtemp(prefix="axiom-bench-")
+    d = boot_dashboard(tmp, args, dex, rpc)
+
+    results = {"meta": dict(vars(args), started=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                            python=platform.python_version(), machine=platform.machine(),
+                            cpus=os.cpu_count())}
+    if not args.skip_routes:
+        results["routes"] = run_routes(d, args)
+    if not args.skip_pipeline:
+        results["pipeline"] = run_pipeline(d, args, dex_cfg, rpc_cfg)
+    results["upstream_requests"] = {"dexscreener": dex.requests, "rpc": rpc.requests}
+    results["cache"] = d.token_cache.snapshot()
+    dex.stop()
+    rpc.stop()
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({k: results[k] for k in ("routes", "pipeline") if k in results}, indent=2))
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+from bench_stats import timed
+from timeseries import TimeSeriesStore
+
+# -------------------------------
+# Time-series store benchmark
+# -------------------------------
+# Fills every token's ring with synthetic random-walk samples, one
+# record_many per simulated sweep, then times the reads the dashboard does:
+# trend indicators for a scanner batch and for the whole watchlist, and the
+# downsampled /tokens series. Reports array memory per token.
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rolling token time series")
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=360, help="Samples kept per token")
+    parser.add_argument("--interval", type=float, default=10, help="Seconds between sweeps")
+    parser.add_argument("--batch", type=int, default=30, help="Tokens per scanner batch")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    store = TimeSeriesStore(capacity=args.capacity, max_tokens=args.tokens, min_interval=args.interval / 2)
+    rng = np.random.default_rng(42)
+    tokens = [f"TOK{i:06d}" for i in range(args.tokens)]
+    price = rng.uniform(0.0001, 5, args.tokens)
+    liquidity = rng.uniform(1e3, 2e6, args.tokens)
+    start_ts = time.time() - args.capacity * args.interval
+
+    t = time.perf_counter()
+    for step in range(args.capacity):
+        price *= np.exp(rng.normal(0, 0.02, args.tokens))
+        liquidity *= np.exp(rng.normal(0, 0.01, args.tokens))
+        samples = [(tok, p, l, p * 1e6, 1e5, None) for tok, p, l in zip(tokens, price.tolist(), liquidity.tolist())]
+        store.record_many(samples, ts=start_ts + step * args.interval)
+    fill_s = time.perf_counter() - t
+
+    batch = tokens[:args.batch]
+    memory = store.memory()
+    results = {
+        "tokens": args.tokens,
+        "capacity": args.capacity,
+        "samples": store.stats["samples"],
+        "samples_per_second": round(store.stats["samples"] / fill_s),
+        "memory_bytes": memory["bytes"],
+        "bytes_per_token": memory["bytes_per_token"],
+        "record_sweep": timed(lambda: store.record_many(samples)),
+        "indicators_batch": timed(lambda: store.indicators(batch, window=600)),
+        "indicators_all": timed(lambda: store.indicators(window=600), repeat=10),
+        "downsample_all": timed(lambda: store.downsample(window=3600, points=60), repeat=10),
+    }
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -------------------------------
+# Local stand-ins for Dexscreener and Solana RPC
+# -------------------------------
+# Both servers answer deterministically per address, so runs are
+# comparable. Latency, jitter, error rate, 429 rate and payload size are
+# plain attributes on StubConfig and can be changed while a server runs.
+
+class StubConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit_rate=0.0, payload_pairs=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.payload_pairs = payload_pairs
+
+    def delay(self, rng):
+        ms = self.latency_ms + (rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+
+def _seed(address):
+    return int(hashlib.sha1(address.encode()).hexdigest()[:8], 16)
+
+
+def fake_pair(address, n=0):
+    rng = random.Random(_seed(address) + n)
+    price = rng.uniform(0.0001, 5)
+    return {
+        "chainId": "solana",
+        "dexId": "raydium",
+        "pairAddress": f"{address[:16]}Pair{n}",
+        "baseToken": {"address": address, "name": f"Token {address[:6]}", "symbol": address[:4].upper()},
+        "quoteToken": {"address": "So11111111111111111111111111111111111111112", "symbol": "SOL"},
+        "priceUsd": f"{price:.6f}",
+        "fdv": round(rng.uniform(1e4, 5e7), 2),
+        "liquidity": {"usd": round(rng.uniform(1e3, 2e6), 2)},
+        "volume": {"h24": round(rng.uniform(0, 1e6), 2)},
+        "priceChange": {"h1": round(rng.uniform(-20, 20), 2)},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs adds ~40ms to every keep-alive response.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _faults(self):
+        # Applies latency, then returns True if a fault response was sent
+        cfg, rng = self.server.cfg, self.server.rng
+        self.server.requests += 1
+        cfg.delay(rng)
+        roll = rng.random()
+        if roll < cfg.rate_limit_rate:
+            self._send(429, headers={"Retry-After": "1"})
+            return True
+        if roll < cfg.rate_limit_rate + cfg.error_rate:
+            self._send(500, b'{"error":"stub failure"}')
+            return True
+        return False
+
+
+class DexscreenerHandler(_Handler):
+    def do_GET(self):
+        if self._faults():
+            return
+        addresses = [a for a in self.path.rstrip("/").rsplit("/", 1)[-1].split(",") if a]
+        pairs = [fake_pair(a, n) for a in addresses for n in range(self.server.cfg.payload_pairs)]
+        self._send(200, json.dumps({"schemaVersion": "1.0.0", "pairs": pairs}).encode())
+
+
+class RpcHandler(_Handler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+        if self._faults():
+            return
+        calls = body if isinstance(body, list) else [body]
+        out = [{"jsonrpc": "2.0", "id": c.get("id"), "result": self.result(c)} for c in calls]
+        self._send(200, json.dumps(out if isinstance(body, list) else out[0]).encode())
+
+    def result(self, call):
+        method, params = call.get("method"), call.get("params") or []
+        if method == "getSlot":
+            return 250_000_000 + int(time.time() * 2.5) % 1_000_000
+        if method == "getBalance":
+            return {"context": {"slot": 1}, "value": _seed(params[0]) % 10 ** 10}
+        if method == "getTokenSupply":
+            return {"context": {"slot": 1}, "value": {"amount": "1000000000000", "decimals": 6, "uiAmount": 1_000_000.0}}
+        if method == "getTokenLargestAccounts":
+            rng = random.Random(_seed(params[0]))
+            top = rng.uniform(1, 60) * 10_000
+            accounts = [{"address": f"Holder{i}", "uiAmount": round(top / (i + 1), 2)}
+                        for i in range(self.server.cfg.payload_pairs * 20)]
+            return {"context": {"slot": 1}, "value": accounts}
+        return None
+
+
+class StubServer:
+    def __init__(self, handler, cfg=None, host="127.0.0.1", port=0):
+        self.cfg = cfg or StubConfig()
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.cfg = self.cfg
+        self.httpd.rng = random.Random(7)
+        self.httpd.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def dexscreener_stub(cfg=None, port=0):
+    return StubServer(DexscreenerHandler, cfg, port=port)
+
+
+def rpc_stub(cfg=None, port=0):
+    return StubServer(RpcHandler, cfg, port=port)
+
+
+# Standalone: point DEXSCREENER_URL / RPC_URL of a running dashboard here
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Dexscreener and RPC stand-in servers")
+    parser.add_argument("--dex-port", type=int, default=8081)
+    parser.add_argument("--rpc-port", type=int, default=8899)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--payload-pairs", type=int, default=1)
+    args = parser.parse_args()
+    cfg = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, args.payload_pairs)
+    dex = dexscreener_stub(cfg, args.dex_port).start()
+    rpc = rpc_stub(cfg, args.rpc_port).start()
+    print(f"DEXSCREENER_URL = {dex.url}/latest/dex/tokens")
+    print(f"RPC_URL         = {rpc.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        dex.stop()
+        rpc.stop()
@@ -0,0 +1,187 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+# -------------------------------
+# Scanner / web worker plumbing
+# -------------------------------
+# In multi-worker mode one scanner process owns all state (bot loops,
+# journal, ledger writes) and N stateless web workers serve reads:
+#   - the scanner publishes a JSON snapshot of events and status to a file
+#     in shared memory (/dev/shm when available), replaced atomically;
+#   - each web worker follows that file and loads changes into its own
+#     read-only copy;
+#   - control requests are forwarded to the scanner over a Unix socket.
+
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+DEFAULT_SNAPSHOT = os.path.join(SHM_DIR, "axiom-snapshot.json")
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "axiom-scanner.sock")
+
+
+def ipc_settings():
+    return (os.environ.get("AXIOM_SNAPSHOT", DEFAULT_SNAPSHOT),
+            os.environ.get("AXIOM_IPC", DEFAULT_SOCKET),
+            os.environ.get("AXIOM_IPC_KEY", "").encode() or None)
+
+
+# -------------------------------
+# Snapshot file
+# -------------------------------
+class SnapshotPublisher:
+    # Rewrites the snapshot whenever the event store moves (debounced), when
+    # asked, and at least every max_interval seconds (only the latter when
+    # events is None).
+    def __init__(self, path, build, events, debounce=0.05, max_interval=1.0):
+        self.path = path
+        self.build = build
+        self.events = events
+        self.debounce = debounce
+        self.max_interval = max_interval
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "last_bytes": 0}
+
+    def start(self):
+        self.publish()
+        threading.Thread(target=self._loop, daemon=True, name="snapshot-publisher").start()
+        return self
+
+    def publish(self):
+        with self._lock:
+            data = json.dumps(self.build(), separators=(",", ":"), ensure_ascii=False).encode()
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            # Owner-only: /dev/shm is world-readable by default
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+            self.stats["published"] += 1
+            self.stats["last_bytes"] = len(data)
+
+    def _loop(self):
+        seen = self.events.last_seq() if self.events is not None else None
+        while True:
+            if self.events is None:
+                time.sleep(self.max_interval)
+            else:
+                self.events.wait_for(seen, ("trade", "log"), timeout=self.max_interval)
+                time.sleep(self.debounce)
+                seen = self.events.last_seq()
+            try:
+                self.publish()
+            except Exception as e:
+                print("Snapshot publish error:", e)
+
+
+class SnapshotFollower:
+    # Polls the snapshot file's stat and hands each new version to load()
+    def __init__(self, path, load, interval=0.1):
+        self.path = path
+        self.load = load
+        self.interval = interval
+        self._version = None
+        # The poll thread and request threads both refresh; loading one at a
+        # time keeps an older snapshot from landing after a newer one
+        self._lock = threading.Lock()
+        self.stats = {"loaded": 0, "last_load_ms": 0.0}
+
+    def start(self):
+        self.refresh()
+        threading.Thread(target=self._loop, daemon=True, name="snapshot-follower").start()
+        return self
+
+    def refresh(self):
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return False
+            if (st.st_ino, st.st_mtime_ns, st.st_size) == self._version:
+                return False
+            started = time.perf_counter()
+            try:
+                with open(self.path, "rb") as f:
+                    # Version of the file actually read, not the one stat() saw
+                    st = os.fstat(f.fileno())
+                    snapshot = json.loads(f.read())
+            except (OSError, ValueError):
+                return False
+            self.load(snapshot)
+            self._version = (st.st_ino, st.st_mtime_ns, st.st_size)
+            self.stats["loaded"] += 1
+            self.stats["last_load_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            return True
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            self.refresh()
+
+
+# -------------------------------
+# Control channel
+# -------------------------------
+class ControlServer:
+    def __init__(self, address, authkey, handler):
+        if os.path.exists(address):
+            os.unlink(address)
+        self.listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        self.handler = handler
+
+    def start(self):
+        threading.Thread(target=self._accept, daemon=True, name="control-accept").start()
+        return self
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except Exception as e:
+                print("Control accept error:", e)
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = self.handler(msg)
+                except Exception as e:
+                    reply = {"status": 500, "headers": [("Content-Type", "application/json")],
+                             "body": json.dumps({"error": str(e)}).encode()}
+                conn.send(reply)
+
+
+class ControlClient:
+    # Small pool of persistent connections; safe to share between threads
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def request(self, msg):
+        for attempt in range(2):
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            try:
+                if conn is None:
+                    conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+                conn.send(msg)
+                reply = conn.recv()
+            except (EOFError, OSError, ConnectionError):
+                # Stale connection (scanner restarted); retry once on a fresh one
+                if conn is not None:
+                    conn.close()
+                if attempt:
+                    raise
+                continue
+            with self._lock:
+                self._idle.append(conn)
+            return reply
@@ -1,11 +1,24 @@
+import atexit
+import glob
 import json
 import os
-import threading
 import time
 import random
-import requests
-from flask import Flask, request, jsonify, render_template, redirect
+import signal
+import sys
+import threading
+from flask import Flask, request, jsonify, render_template, redirect, Response, stream_with_context, g
 from flask_cors import CORS
+from http_pool import make_session
+from token_cache import TTLCache
+from scanner import WatchlistScanner
+from event_store import EventStore, Journal
+from ledger import TradeLedger
+from scheduler import Scheduler, RateLimited
+from rpc_client import RpcClient
+from metrics import Registry, merge as merge_metrics, render as render_metrics
+from timeseries import TimeSeriesStore
+from cluster import ipc_settings, SnapshotPublisher, SnapshotFollower, ControlServer, ControlClient
 
 # -------------------------------
 # Flask app setup
@@ -14,7 +27,18 @@ app = Flask(__name__, template_folder="templates")
 CORS(app)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_FILE = os.path.join(BASE_DIR, "config.json")
+CONFIG_FILE = os.environ.get("AXIOM_CONFIG", os.path.join(BASE_DIR, "config.json"))
+
+# standalone: everything in one process (python dashboard.py)
+# scanner:    runs the jobs and owns all state; no HTTP server of its own
+# web:        gunicorn worker; serves reads from the scanner's snapshot and
+#             forwards control requests to it (see gunicorn.conf.py)
+ROLE = os.environ.get("AXIOM_ROLE", "standalone")
+IS_WEB = ROLE == "web"
+# The control channel unpickles whatever it receives, so its key must be a
+# secret shared by this deployment only (gunicorn.conf.py generates one)
+if ROLE in ("scanner", "web") and not os.environ.get("AXIOM_IPC_KEY"):
+    raise RuntimeError(f"AXIOM_IPC_KEY must be set to run the {ROLE} role")
 
 # -------------------------------
 # Config helpers
@@ -44,143 +68,358 @@ print("RPC_URL LOADED:", RPC_URL)
 bot_status = {"demo": config.get("DEMO_MODE", True), "running": False}
 sniper_status = {"enabled": False}
 risk_settings = {"take_profit": config.get("TAKE_PROFIT", 50), "stop_loss": config.get("STOP_LOSS", 20)}
-filters = {"marketcap": 0, "liquidity": 0}
-trades = []
-wallets = [
-    {"address": "Wallet1...abc", "trades": 45, "profit": 230, "pl": "+10%"},
-    {"address": "Wallet2...xyz", "trades": 32, "profit": -50, "pl": "-3%"}
-]
-logs = []
+# Trend filters are percentages over TREND_WINDOW; 0 turns them off
+filters = {"marketcap": 0, "liquidity": 0, "max_liquidity_drop": 0, "max_volatility": 0}
+# Web workers hold a read-only copy of the event rings; only the process
+# that appends events keeps a journal.
+journal = None if IS_WEB else Journal(
+    os.path.join(BASE_DIR, config.get("JOURNAL_FILE", "events.jsonl")),
+    fsync=config.get("JOURNAL_FSYNC", "batch"),
+    max_bytes=config.get("JOURNAL_MAX_BYTES", 16 * 1024 * 1024),
+)
+events = EventStore(capacity=config.get("EVENT_CAPACITY", 50), journal=journal)
+trades = events.channel("trade")
+ledger = TradeLedger(
+    os.path.join(BASE_DIR, config.get("LEDGER_FILE", "trades.db")),
+    batch_size=config.get("LEDGER_BATCH_SIZE", 500),
+    writer=not IS_WEB,
+)
+logs = events.channel("log")
+if journal is not None:
+    print("EVENTS REPLAYED FROM JOURNAL:", events.replay())
+atexit.register(events.close)
+atexit.register(ledger.close)
 
 # -------------------------------
-# Dexscreener helper
+# Scheduler and upstream rate limits
 # -------------------------------
-def get_token_data(token_address):
+# Jobs, upstream clients, the token cache and the series only exist where
+# the jobs run; in a web worker they stay None and the routes that need
+# them are forwarded to the scanner.
+RUNS_JOBS = not IS_WEB
+scheduler = Scheduler(workers=config.get("SCHEDULER_WORKERS", 4)) if RUNS_JOBS else None
+if RUNS_JOBS:
+    dexscreener_limit = scheduler.limiter("dexscreener", rate=config.get("DEXSCREENER_RATE", 5), burst=10)
+    rpc_limit = scheduler.limiter("rpc", rate=config.get("RPC_RATE", 10), burst=20)
+
+def retry_after(response, default=5.0):
     try:
-        url = f"https://api.dexscreener.io/latest/dex/tokens/{token_address}"
-        r = requests.get(url, timeout=10)
-        data = r.json()
-        pools = data.get("pairs", [])
-        if not pools:
-            return None
-        pool = pools[0]
-        marketcap = pool.get("fdv", 0)
-        liquidity = pool.get("liquidity", {}).get("usd", 0)
-        return marketcap, liquidity
-    except Exception as e:
-        print("Dexscreener error:", e)
-        return None
+        return float(response.headers.get("Retry-After", default))
+    except ValueError:
+        return default
 
 # -------------------------------
-# Rug check with live data
+# Metrics
 # -------------------------------
-def passes_rug_check(token: str) -> bool:
-    stats = get_token_data(token)
-    if not stats:
-        logs.append(f"[{time.strftime('%H:%M:%S')}] ⚠️ Could not fetch data for {token}")
-        if len(logs) > 50: logs.pop(0)
-        return False
+registry = Registry()
+route_latency = registry.histogram(
+    "axiom_http_request_duration_seconds", "Flask route latency", ("route", "method", "status"))
+upstream_latency = registry.histogram(
+    "axiom_upstream_request_duration_seconds", "Upstream HTTP call latency", ("upstream", "call", "outcome"))
+rugcheck_stage = registry.histogram(
+    "axiom_rugcheck_stage_duration_seconds", "Time spent in each rug-check stage", ("stage",))
+rugcheck_results = registry.counter(
+    "axiom_rugcheck_results_total", "Rug-check outcomes; anything but passed is the rejecting filter", ("result",))
+sweep_latency = registry.histogram(
+    "axiom_watchlist_sweep_duration_seconds", "Full watchlist sweep time", ("job",),
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
 
-    marketcap, liquidity = stats
-
-    # Log fetched data
-    logs.append(f"[{time.strftime('%H:%M:%S')}] 🧪 Marketcap {token}: ${marketcap}")
-    if len(logs) > 50: logs.pop(0)
-    logs.append(f"[{time.strftime('%H:%M:%S')}] 🧪 Liquidity {token}: ${liquidity}")
-    if len(logs) > 50: logs.pop(0)
+# -------------------------------
+# Dexscreener helper
+# -------------------------------
+DEXSCREENER_URL = config.get("DEXSCREENER_URL", "https://api.dexscreener.io/latest/dex/tokens")
+DEXSCREENER_MAX_BATCH = 30
+http = make_session(pool_size=config.get("HTTP_POOL_SIZE", 10)) if RUNS_JOBS else None
+
+def pool_stats(pool):
+    marketcap = pool.get("fdv", 0)
+    liquidity = pool.get("liquidity", {}).get("usd", 0)
+    price = float(pool.get("priceUsd") or "nan")
+    volume = pool.get("volume", {}).get("h24", 0)
+    return marketcap, liquidity, price, volume
+
+def series_sample(token, pool, stats):
+    marketcap, liquidity, price, volume = stats
+    return token, price, liquidity, marketcap, volume, pool.get("baseToken", {}).get("name")
+
+def dexscreener_get(path, call):
+    dexscreener_limit.acquire()
+    started = time.perf_counter()
+    try:
+        r = http.get(f"{DEXSCREENER_URL}/{path}", timeout=10)
+    except Exception:
+        upstream_latency.observe(time.perf_counter() - started, ("dexscreener", call, "error"))
+        raise
+    upstream_latency.observe(time.perf_counter() - started, ("dexscreener", call, str(r.status_code)))
+    return r
+
+def fetch_token_batch(token_addresses):
+    # One call for up to 30 addresses; the first pair listed per token wins
+    r = dexscreener_get(",".join(token_addresses), "batch")
+    if r.status_code == 429:
+        wait = retry_after(r)
+        dexscreener_limit.pause(wait)
+        raise RateLimited("dexscreener", wait)
+    r.raise_for_status()
+    wanted = set(token_addresses)
+    result, samples = {}, []
+    for pool in r.json().get("pairs") or []:
+        addr = pool.get("baseToken", {}).get("address")
+        if addr in wanted and addr not in result:
+            result[addr] = pool_stats(pool)
+            samples.append(series_sample(addr, pool, result[addr]))
+    series.record_many(samples)
+    return result
+
+# Every Dexscreener answer also lands in the rolling series that back the
+# trend filters and the /tokens charts
+series = None if not RUNS_JOBS else TimeSeriesStore(
+    capacity=config.get("SERIES_CAPACITY", 360),
+    max_tokens=config.get("SERIES_MAX_TOKENS", 4096),
+    min_interval=config.get("SERIES_MIN_INTERVAL", 5),
+)
+TREND_WINDOW = config.get("TREND_WINDOW", 600)
+
+# Filled by the scanner's batch fetches (see WatchlistScanner.sweep)
+token_cache = None if not RUNS_JOBS else TTLCache(
+    ttl=config.get("CACHE_TTL", 15),
+    stale_ttl=config.get("CACHE_STALE_TTL", 45),
+    error_ttl=config.get("CACHE_ERROR_TTL", 5),
+    max_entries=config.get("CACHE_MAX_ENTRIES", 1024),
+)
+
+scanner = None if not RUNS_JOBS else WatchlistScanner(
+    fetch_token_batch,
+    cache=token_cache,
+    batch_size=min(config.get("SCAN_BATCH_SIZE", DEXSCREENER_MAX_BATCH), DEXSCREENER_MAX_BATCH),
+    max_workers=config.get("SCAN_WORKERS", 4),
+)
 
-    if marketcap < filters.get("marketcap", 0):
-        logs.append(f"[{time.strftime('%H:%M:%S')}] 🚨 Rug check failed: marketcap too low")
-        if len(logs) > 50: logs.pop(0)
-        return False
-    if liquidity < filters.get("liquidity", 0):
-        logs.append(f"[{time.strftime('%H:%M:%S')}] 🚨 Rug check failed: liquidity too low")
-        if len(logs) > 50: logs.pop(0)
-        return False
+# -------------------------------
+# Log helper
+# -------------------------------
+def add_log(message):
+    logs.append(f"[{time.strftime('%H:%M:%S')}] {message}")
 
-    # (Optional holder simulation still)
-    largest_holder_percent = random.randint(1, 100)
-    logs.append(f"[{time.strftime('%H:%M:%S')}] 🧪 Holder check {token}: top holder = {largest_holder_percent}%")
-    if len(logs) > 50: logs.pop(0)
-    if largest_holder_percent > 40:
-        logs.append(f"[{time.strftime('%H:%M:%S')}] 🚨 Rug check failed: top holder owns too much")
-        if len(logs) > 50: logs.pop(0)
-        return False
+# -------------------------------
+# Trade recording
+# -------------------------------
+def record_trade(token, action, usd_amount, pl_value, source):
+    ts = time.time()
+    pl_str = f"{'+' if pl_value >= 0 else ''}{pl_value}%"
+    trade = {"time": time.strftime("%H:%M:%S", time.localtime(ts)), "ts": ts, "token": token,
+             "type": action, "usd": usd_amount, "pl": pl_str}
+    trades.append(trade)
+    wallet = "demo" if bot_status["demo"] else config.get("WALLET_ADDRESS", "live")
+    ledger.record(ts, token, action, usd_amount, pl_value, wallet, source)
+    return trade
 
-    logs.append(f"[{time.strftime('%H:%M:%S')}] ✅ Rug check passed for {token}")
-    if len(logs) > 50: logs.pop(0)
-    return True
+# -------------------------------
+# Rug check with live data
+# -------------------------------
+MAX_HOLDER_PERCENT = 40
+
+def holder_percents(tokens):
+    # Top-holder share of supply from RPC. Demo mode falls back to the old
+    # simulation when RPC is unavailable; live mode treats it as a failure.
+    percents = rpc.top_holder_percents(tokens) if tokens else {}
+    if bot_status["demo"]:
+        for token, pct in percents.items():
+            if pct is None:
+                percents[token] = random.randint(1, 100)
+    return percents
+
+def trend_rejects(tokens):
+    # {token: reason} for tokens failing the trend filters. Tokens without
+    # two samples inside TREND_WINDOW yet are let through.
+    max_drop = filters.get("max_liquidity_drop", 0)
+    max_volatility = filters.get("max_volatility", 0)
+    if not tokens or not (max_drop or max_volatility):
+        return {}
+    rejects = {}
+    for token, ind in series.indicators(tokens, window=TREND_WINDOW).items():
+        if max_drop and ind["liquidity_drawdown"] is not None and -ind["liquidity_drawdown"] > max_drop:
+            rejects[token] = "liquidity_drop"
+        elif max_volatility and ind["volatility"] is not None and ind["volatility"] > max_volatility:
+            rejects[token] = "volatility"
+    return rejects
+
+def rug_check_batch(batch, tally):
+    # Thresholds are read once and applied to the whole batch
+    started = time.perf_counter()
+    counts = dict.fromkeys(tally, 0)
+    min_marketcap = filters.get("marketcap", 0)
+    min_liquidity = filters.get("liquidity", 0)
+    candidates = []
+    for token, stats in batch:
+        if not stats:
+            counts["no_data"] += 1
+        elif stats[0] < min_marketcap:
+            counts["marketcap"] += 1
+        elif stats[1] < min_liquidity:
+            counts["liquidity"] += 1
+        else:
+            candidates.append(token)
+    rejects = trend_rejects(candidates)
+    for reason in rejects.values():
+        counts[reason] += 1
+    candidates = [t for t in candidates if t not in rejects]
+    rugcheck_stage.observe(time.perf_counter() - started, ("filters",))
+
+    # Holder lookups for the survivors go out together and share RPC batches
+    with rugcheck_stage.time(("holders",)):
+        percents = holder_percents(candidates)
+    passed = []
+    for token in candidates:
+        pct = percents.get(token)
+        if pct is None or pct > MAX_HOLDER_PERCENT:
+            counts["holder"] += 1
+        else:
+            passed.append(token)
+
+    for reason, n in counts.items():
+        if n:
+            tally[reason] += n
+            rugcheck_results.inc((reason,), n)
+    rugcheck_results.inc(("passed",), len(passed))
+    rugcheck_stage.observe(time.perf_counter() - started, ("batch_total",))
+    return passed
+
+def scan_watchlist(label):
+    # Yields tokens that pass the rug check as their batches arrive
+    token_list = config.get("TOKENS", [])
+    tally = {"no_data": 0, "marketcap": 0, "liquidity": 0, "liquidity_drop": 0, "volatility": 0, "holder": 0}
+    n_passed = 0
+    started = time.monotonic()
+    waited = time.perf_counter()
+    for batch in scanner.sweep(token_list):
+        rugcheck_stage.observe(time.perf_counter() - waited, ("fetch",))
+        for token in rug_check_batch(batch, tally):
+            n_passed += 1
+            yield token
+        waited = time.perf_counter()
+    elapsed = time.monotonic() - started
+    sweep_latency.observe(elapsed, (label.lower(),))
+    add_log(f"🔁 {label} sweep: {len(token_list)} tokens, {n_passed} passed, "
+            f"{sum(tally.values())} rejected {tally} in {elapsed:.2f}s")
 
 # -------------------------------
 # RPC helper
 # -------------------------------
+# RPC_URLS lists failover endpoints; RPC_URL alone still works.
+rpc = None if not RUNS_JOBS else RpcClient(
+    config.get("RPC_URLS") or [RPC_URL],
+    limiter=rpc_limit,
+    batch_window=config.get("RPC_BATCH_WINDOW", 0.005),
+    max_batch=config.get("RPC_MAX_BATCH", 50),
+    pool_size=config.get("HTTP_POOL_SIZE", 10),
+    on_request=lambda elapsed, outcome: upstream_latency.observe(elapsed, ("rpc", "batch", outcome)),
+)
+
 def get_current_slot():
-    if not RPC_URL:
-        return {"error": "No RPC_URL set in config.json"}
     try:
-        payload = {"jsonrpc": "2.0", "id": 1, "method": "getSlot"}
-        r = requests.post(RPC_URL, json=payload, timeout=10)
-        return r.json()
+        return {"jsonrpc": "2.0", "id": 1, "result": rpc.get_slot()}
     except Exception as e:
         return {"error": str(e)}
 
 # -------------------------------
-# Bot loop
+# Bot job
 # -------------------------------
-def run_bot():
-    while bot_status["running"]:
-        token_list = config.get("TOKENS", [])
-        token = random.choice(token_list) if token_list else None
-        if not token:
-            time.sleep(3)
-            continue
+# One watchlist sweep per run; the scheduler re-runs it while the bot is on.
+def bot_scan():
+    if not config.get("TOKENS"):
+        return 3
 
-        if not passes_rug_check(token):
-            time.sleep(random.uniform(3, 6))
-            continue
+    for token in scan_watchlist("Bot"):
+        if not bot_status["running"]:
+            break
 
         action = random.choice(["Buy", "Sell"])
         usd_amount = round(random.uniform(50, 500), 2)
         pl_value = round(random.uniform(-5, 5), 2)
-        pl_str = f"{'+' if pl_value >= 0 else ''}{pl_value}%"
-        trade_time = time.strftime("%H:%M:%S")
-
-        trades.append({"time": trade_time, "token": token, "type": action, "usd": usd_amount, "pl": pl_str})
-        if len(trades) > 50: trades.pop(0)
+        trade = record_trade(token, action, usd_amount, pl_value, "bot")
 
-        logs.append(f"[{trade_time}] ✅ Demo trade: {action} {token} for ${usd_amount} ({pl_str})")
-        if len(logs) > 50: logs.pop(0)
-
-        time.sleep(random.uniform(3, 6))
+        add_log(f"✅ Demo trade: {action} {token} for ${usd_amount} ({trade['pl']})")
 
 # -------------------------------
-# Sniper loop
+# Sniper job
 # -------------------------------
-def run_sniper():
-    while sniper_status["enabled"]:
-        token_list = config.get("TOKENS", [])
-        token = random.choice(token_list) if token_list else None
-        if not token:
-            time.sleep(3)
-            continue
+def sniper_scan():
+    if not config.get("TOKENS"):
+        return 3
 
-        if not passes_rug_check(token):
-            time.sleep(random.uniform(5, 8))
-            continue
+    for token in scan_watchlist("Sniper"):
+        if not sniper_status["enabled"]:
+            break
 
         action = "Buy"
         usd_amount = round(random.uniform(100, 800), 2)
         pl_value = round(random.uniform(-3, 8), 2)
-        pl_str = f"{'+' if pl_value >= 0 else ''}{pl_value}%"
-        trade_time = time.strftime("%H:%M:%S")
+        trade = record_trade(token, action, usd_amount, pl_value, "sniper")
 
-        trades.append({"time": trade_time, "token": token, "type": action, "usd": usd_amount, "pl": pl_str})
-        if len(trades) > 50: trades.pop(0)
+        add_log(f"🎯 [SNIPER] Auto-{action} {token} for ${usd_amount} ({trade['pl']})")
 
-        logs.append(f"[{trade_time}] 🎯 [SNIPER] Auto-{action} {token} for ${usd_amount} ({pl_str})")
-        if len(logs) > 50: logs.pop(0)
+# -------------------------------
+# Market sampling job
+# -------------------------------
+# Always on, so the series behind /tokens and the trend filters fill even
+# while the bot and sniper are off. Cache hits don't add samples, so a
+# token is sampled about once per CACHE_TTL.
+SERIES_SAMPLE_INTERVAL = config.get("SERIES_SAMPLE_INTERVAL", 10)
+
+def market_sample():
+    token_list = config.get("TOKENS", [])
+    if not token_list:
+        return 3
+    with sweep_latency.time(("market",)):
+        for _ in scanner.sweep(token_list):
+            pass
+
+# Sniper runs ahead of the bot when both are due; sampling yields to both
+if RUNS_JOBS:
+    scheduler.register("sniper", sniper_scan, interval=lambda: random.uniform(5, 10), priority=0)
+    scheduler.register("bot", bot_scan, interval=lambda: random.uniform(3, 6), priority=10)
+    scheduler.register("market", market_sample, interval=SERIES_SAMPLE_INTERVAL, priority=20)
+    scheduler.start()
+    scheduler.start_job("market")
 
-        time.sleep(random.uniform(5, 10))
+# -------------------------------
+# Request metrics
+# -------------------------------
+REPLAYED_ENVIRON_KEY = "axiom.replayed"
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop("request_started", None)
+    # Requests replayed for a web worker were already timed there
+    if started is not None and not request.environ.get(REPLAYED_ENVIRON_KEY):
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        route_latency.observe(time.perf_counter() - started, (route, request.method, str(response.status_code)))
+    return response
+
+registry.gauge("axiom_threads", "Live Python threads", threading.active_count)
+registry.gauge("axiom_event_buffer_size", "Events held in each ring buffer",
+               lambda: {("trade",): len(trades), ("log",): len(logs)}, ("channel",))
+if RUNS_JOBS:
+    registry.gauge("axiom_journal_bytes", "Size of the active event journal", journal.size)
+    registry.gauge("axiom_ledger_queue_depth", "Trades waiting for the ledger writer", ledger.queue_depth)
+    registry.gauge("axiom_token_cache_entries", "Entries in the token data cache",
+                   lambda: token_cache.snapshot()["size"])
+    registry.counter_callback(
+        "axiom_token_cache_lookups_total", "Token cache lookups by result",
+        lambda: {(k,): v for k, v in token_cache.snapshot().items() if k in ("hits", "misses", "stale", "coalesced")},
+        ("result",))
+    registry.gauge("axiom_scheduler_queue_depth", "Jobs due and waiting for a worker",
+                   lambda: scheduler.snapshot()["queue_depth"])
+    registry.gauge("axiom_scheduler_busy_workers", "Scheduler workers running a job",
+                   lambda: scheduler.snapshot()["busy_workers"])
+    registry.gauge("axiom_series_tokens", "Tokens held in the rolling time series", lambda: len(series))
+    registry.gauge("axiom_series_bytes", "Memory held by the time-series arrays", lambda: series.memory()["bytes"])
+    registry.gauge("axiom_rpc_pending_calls", "RPC calls waiting to be batched", lambda: rpc.snapshot()["pending"])
 
 # -------------------------------
 # Routes
@@ -200,20 +439,22 @@ def toggle_demo():
 def start_bot():
     bot_status["running"] = not bot_status["running"]
     if bot_status["running"]:
-        threading.Thread(target=run_bot, daemon=True).start()
-        logs.append(f"[{time.strftime('%H:%M:%S')}] ✅ Bot started")
+        scheduler.start_job("bot")
+        add_log("✅ Bot started")
     else:
-        logs.append(f"[{time.strftime('%H:%M:%S')}] ⏹️ Bot stopped")
+        scheduler.stop_job("bot")
+        add_log("⏹️ Bot stopped")
     return jsonify(bot_status)
 
 @app.route("/toggle_sniper", methods=["POST"])
 def toggle_sniper():
     sniper_status["enabled"] = not sniper_status["enabled"]
     if sniper_status["enabled"]:
-        threading.Thread(target=run_sniper, daemon=True).start()
-        logs.append(f"[{time.strftime('%H:%M:%S')}] 🎯 Sniper mode ENABLED")
+        scheduler.start_job("sniper")
+        add_log("🎯 Sniper mode ENABLED")
     else:
-        logs.append(f"[{time.strftime('%H:%M:%S')}] 🎯 Sniper mode DISABLED")
+        scheduler.stop_job("sniper")
+        add_log("🎯 Sniper mode DISABLED")
     return jsonify(sniper_status)
 
 @app.route("/save_risk", methods=["POST"])
@@ -224,7 +465,7 @@ def save_risk():
     config["TAKE_PROFIT"] = risk_settings["take_profit"]
     config["STOP_LOSS"] = risk_settings["stop_loss"]
     save_config()
-    logs.append(f"[{time.strftime('%H:%M:%S')}] ⚙️ Risk settings updated")
+    add_log("⚙️ Risk settings updated")
     return jsonify({"message": "Risk settings saved!", "risk": risk_settings})
 
 @app.route("/save_filters", methods=["POST"])
@@ -232,20 +473,133 @@ def save_filters():
     data = request.json
     filters["marketcap"] = int(data.get("marketcap", filters["marketcap"]))
     filters["liquidity"] = int(data.get("liquidity", filters["liquidity"]))
-    logs.append(f"[{time.strftime('%H:%M:%S')}] ⚙️ Filters updated")
+    filters["max_liquidity_drop"] = float(data.get("max_liquidity_drop", filters["max_liquidity_drop"]))
+    filters["max_volatility"] = float(data.get("max_volatility", filters["max_volatility"]))
+    add_log("⚙️ Filters updated")
     return jsonify({"message": "Filters saved!", "filters": filters})
 
+def delta_response(channel):
+    # ?since=<seq> returns only newer items; X-Seq is the cursor for the next
+    # call. A cursor from before a restart (ahead of the store) gets the full
+    # list back, flagged with X-Snapshot.
+    since = request.args.get("since", type=int)
+    if since is not None and since > events.last_seq():
+        since = None
+    etag = f"{events.epoch}-{channel}-{events.last_seq(channel)}-{since}"
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        items, seq = events.items(channel, since)
+        resp = jsonify(items)
+        resp.headers["X-Seq"] = str(seq)
+        if since is None:
+            resp.headers["X-Snapshot"] = "1"
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+def conditional_json(data):
+    resp = jsonify(data)
+    resp.add_etag()
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
+
+LEDGER_QUERY_ARGS = ("cursor", "limit", "token", "action", "from", "to")
+
 @app.route("/get_trades", methods=["GET"])
 def get_trades():
-    return jsonify(trades)
+    # Live feed by default; any ledger filter switches to a history page
+    if not any(arg in request.args for arg in LEDGER_QUERY_ARGS):
+        return delta_response("trade")
+    args = request.args
+    try:
+        rows, next_cursor = ledger.query(
+            token=args.get("token"),
+            action=args.get("action"),
+            start=args.get("from", type=float),
+            end=args.get("to", type=float),
+            cursor=args.get("cursor"),
+            limit=max(1, min(args.get("limit", 50, type=int), 500)),
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    items = [{"id": r["id"], "time": time.strftime("%H:%M:%S", time.localtime(r["ts"])), "ts": r["ts"],
+              "token": r["token"], "type": r["action"], "usd": r["usd"],
+              "pl": f"{'+' if r['pl_pct'] >= 0 else ''}{r['pl_pct']}%", "wallet": r["wallet"],
+              "source": r["source"]} for r in rows]
+    return jsonify({"items": items, "next": next_cursor})
 
 @app.route("/get_wallets", methods=["GET"])
 def get_wallets():
-    return jsonify(wallets)
+    result = []
+    for w in ledger.wallet_pnl():
+        pl = round(w["profit"] / w["volume"] * 100, 2) if w["volume"] else 0
+        result.append({"address": w["wallet"], "trades": w["trades"], "profit": round(w["profit"], 2),
+                       "pl": f"{'+' if pl >= 0 else ''}{pl}%"})
+    return conditional_json(result)
+
+@app.route("/pnl_summary", methods=["GET"])
+def pnl_summary():
+    token = request.args.get("token")
+    if token:
+        return jsonify({"token": ledger.token_pnl(token)})
+    return jsonify({
+        "totals": ledger.totals(),
+        "wallets": ledger.wallet_pnl(),
+        "tokens": ledger.token_pnl(top=max(1, min(request.args.get("top", 10, type=int), 100))),
+        # A web worker's handle is read-only; the writer's stats come with the snapshot
+        "ledger": snapshot_state["ledger"] if ledger.readonly else ledger.stats,
+    })
 
 @app.route("/get_logs", methods=["GET"])
 def get_logs():
-    return jsonify(logs)
+    return delta_response("log")
+
+# Each open stream holds a server thread. Past STREAM_LIMIT per process new
+# streams get a 503 and the page falls back to delta polling; streams end
+# after STREAM_MAX_SECONDS (the browser reconnects from Last-Event-ID) and
+# as soon as the process starts shutting down.
+STREAM_LIMIT = config.get("STREAM_LIMIT", max(1, int(os.environ.get("AXIOM_THREADS", 16)) // 2) if IS_WEB else 64)
+STREAM_MAX_SECONDS = config.get("STREAM_MAX_SECONDS", 300)
+STREAM_KEEPALIVE = 15
+stream_slots = threading.BoundedSemaphore(STREAM_LIMIT)
+streams_closing = threading.Event()
+
+@app.route("/stream", methods=["GET"])
+def stream():
+    # Server-Sent Events: pushes trade and log events as they are appended.
+    # Resumes from Last-Event-ID on reconnect, or ?since= on first connect.
+    if not stream_slots.acquire(blocking=False):
+        return jsonify({"error": "Too many open streams; poll /get_trades and /get_logs instead"}), 503
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", type=int)
+    if since is None or since > events.last_seq():
+        since = events.last_seq()
+
+    def generate(cursor):
+        yield "retry: 3000\n\n"
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        quiet_since = time.monotonic()
+        while time.monotonic() < deadline and not streams_closing.is_set():
+            # Short waits so shutdown and the deadline are noticed promptly
+            batch = events.wait_for(cursor, ("trade", "log"), timeout=1)
+            if not batch:
+                if time.monotonic() - quiet_since >= STREAM_KEEPALIVE:
+                    yield ": keepalive\n\n"
+                    quiet_since = time.monotonic()
+                continue
+            for seq, channel, item in batch:
+                yield f"id: {seq}\nevent: {channel}\ndata: {json.dumps(item)}\n\n"
+                cursor = seq
+            quiet_since = time.monotonic()
+
+    resp = Response(stream_with_context(generate(since)), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # Released when the server closes the response, even if the generator
+    # never started (client gone before the first write)
+    resp.call_on_close(stream_slots.release)
+    return resp
 
 @app.route("/update_tokens", methods=["POST"])
 def update_tokens():
@@ -253,27 +607,263 @@ def update_tokens():
     token_list = [t.strip() for t in token_str.split(",") if t.strip()]
     config["TOKENS"] = token_list
     save_config()
-    logs.append(f"[{time.strftime('%H:%M:%S')}] ✅ Tokens updated")
+    add_log("✅ Tokens updated")
     return redirect("/")
 
-@app.route("/tokens", methods=["GET"])
-def tokens_route():
+TOKENS_DEFAULT_PARAMS = (3600.0, 60)
+
+def tokens_params():
+    window = max(60.0, min(request.args.get("window", TOKENS_DEFAULT_PARAMS[0], type=float), 86400.0))
+    points = max(1, min(request.args.get("points", TOKENS_DEFAULT_PARAMS[1], type=int), 500))
+    return window, points
+
+def tokens_payload(token_list, window, points):
+    # Latest Dexscreener values, trend indicators over TREND_WINDOW, and the
+    # last `window` seconds downsampled to `points` buckets for charting.
+    # The bucket grid is aligned so the ETag only moves when data does.
+    step = window / points
+    now = (time.time() // step + 1) * step
+    latest = series.latest(token_list)
+    trends = series.indicators(token_list, window=TREND_WINDOW)
+    start, step, history = series.downsample(token_list, window, points, now=now)
     result = []
-    for t in config.get("TOKENS", []):
+    for t in token_list:
+        last = latest.get(t, {})
         result.append({
-            "name": "DemoToken",
+            "name": last.get("name") or "Unknown",
             "address": t,
-            "price": round(1.23, 4),
-            "volume": 12345
+            "price": last.get("price"),
+            "volume": last.get("volume"),
+            "liquidity": last.get("liquidity"),
+            "marketcap": last.get("marketcap"),
+            "updated": last.get("ts"),
+            "trend": trends.get(t),
+            "series": dict(history.get(t, {}), start=start, step=step),
         })
-    return jsonify(result)
+    return result
+
+@app.route("/tokens", methods=["GET"])
+def tokens_route():
+    # Web workers serve the default chart from the scanner's published copy;
+    # other windows are forwarded (see forward_to_scanner)
+    if IS_WEB:
+        return conditional_json(tokens_state["payload"])
+    return conditional_json(tokens_payload(config.get("TOKENS", []), *tokens_params()))
+
+@app.route("/series_stats", methods=["GET"])
+def series_stats():
+    if IS_WEB:
+        return jsonify(tokens_state["series_stats"])
+    return jsonify(series.snapshot())
+
+@app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    return jsonify(token_cache.snapshot())
+
+@app.route("/scan_stats", methods=["GET"])
+def scan_stats():
+    return jsonify(scanner.snapshot())
+
+@app.route("/scheduler_stats", methods=["GET"])
+def scheduler_stats():
+    return jsonify(scheduler.snapshot())
+
+@app.route("/journal_stats", methods=["GET"])
+def journal_stats():
+    return jsonify(dict(journal.stats, size=journal.size(), path=journal.path))
+
+@app.route("/rpc_stats", methods=["GET"])
+def rpc_stats():
+    return jsonify(rpc.snapshot())
+
+@app.route("/metrics", methods=["GET"])
+def metrics_route():
+    text = render_metrics(cluster_metrics()) if IS_WEB else registry.render()
+    return Response(text, mimetype="text/plain; version=0.0.4")
 
 @app.route("/test_rpc", methods=["GET"])
 def test_rpc():
     return jsonify(get_current_slot())
 
+# -------------------------------
+# Multi-worker mode
+# -------------------------------
+SNAPSHOT_FILE, IPC_SOCKET, IPC_KEY = ipc_settings()
+
+# Anything that changes state or reports scanner internals runs in the scanner
+SCANNER_ENDPOINTS = {
+    "toggle_demo", "start_bot", "toggle_sniper", "save_risk", "save_filters", "update_tokens",
+    "cache_stats", "scan_stats", "scheduler_stats", "journal_stats", "rpc_stats", "test_rpc",
+    "tokens_route", "series_stats",
+}
+FORWARDED_HEADERS = ("Content-Type", "Location", "ETag", "Cache-Control")
+# Config the web workers need; RPC URLs (API keys) and wallet settings
+# never leave the scanner
+SHARED_CONFIG_KEYS = ("TOKENS", "DEMO_MODE", "TAKE_PROFIT", "STOP_LOSS")
+
+def build_snapshot():
+    epoch, seq, records = events.export()
+    shared = {k: config[k] for k in SHARED_CONFIG_KEYS if k in config}
+    return {"published_at": time.time(), "epoch": epoch, "seq": seq, "events": records, "config": shared,
+            "bot_status": bot_status, "ledger": dict(ledger.stats),
+            "sniper_status": sniper_status, "risk": risk_settings, "filters": filters}
+
+# The scanner republishes at least every second, so an old snapshot means
+# it is down or wedged
+SNAPSHOT_STALE_SECONDS = config.get("SNAPSHOT_STALE_SECONDS", 10)
+snapshot_state = {"published_at": None, "ledger": {}}
+
+def snapshot_age():
+    published = snapshot_state["published_at"]
+    return None if published is None else max(0.0, time.time() - published)
+
+def sync_dict(target, source):
+    # In place, so modules holding a reference see the new values
+    for key in [k for k in target if k not in source]:
+        del target[key]
+    target.update(source)
+
+def load_snapshot(snapshot):
+    snapshot_state["published_at"] = snapshot["published_at"]
+    snapshot_state["ledger"] = snapshot["ledger"]
+    events.load(snapshot["events"], snapshot["seq"], snapshot["epoch"])
+    config.update(snapshot["config"])
+    sync_dict(bot_status, snapshot["bot_status"])
+    sync_dict(sniper_status, snapshot["sniper_status"])
+    sync_dict(risk_settings, snapshot["risk"])
+    sync_dict(filters, snapshot["filters"])
+
+def handle_control(msg):
+    # Replays a forwarded request against this process's routes
+    with app.test_client() as client:
+        resp = client.open(msg["path"], method=msg["method"], query_string=msg["query_string"],
+                           data=msg["data"], content_type=msg["content_type"], headers=msg.get("headers"),
+                           environ_base={REPLAYED_ENVIRON_KEY: True})
+    if msg["method"] != "GET":
+        publisher.publish()
+        tokens_publisher.publish()
+    return {"status": resp.status_code, "body": resp.get_data(),
+            "headers": [(k, v) for k, v in resp.headers.items() if k in FORWARDED_HEADERS]}
+
+# /tokens at its default window and the series stats, published on their
+# own schedule since building them costs more than the event snapshot
+TOKENS_SNAPSHOT_FILE = f"{SNAPSHOT_FILE}.tokens"
+TOKENS_PUBLISH_INTERVAL = config.get("TOKENS_PUBLISH_INTERVAL", 5)
+tokens_state = {"payload": None, "series_stats": None}
+
+def build_tokens_snapshot():
+    return {"payload": tokens_payload(config.get("TOKENS", []), *TOKENS_DEFAULT_PARAMS),
+            "series_stats": series.snapshot()}
+
+def load_tokens_snapshot(snapshot):
+    tokens_state.update(snapshot)
+
+if ROLE == "scanner":
+    publisher = SnapshotPublisher(SNAPSHOT_FILE, build_snapshot, events).start()
+    tokens_publisher = SnapshotPublisher(TOKENS_SNAPSHOT_FILE, build_tokens_snapshot, None,
+                                         max_interval=TOKENS_PUBLISH_INTERVAL).start()
+
+# Every process publishes its own metrics next to the snapshot; /metrics on
+# any web worker renders the merge, so route latency from all workers shows
+# up alongside the scanner's
+METRICS_PREFIX = f"{SNAPSHOT_FILE}.metrics."
+METRICS_INTERVAL = config.get("METRICS_PUBLISH_INTERVAL", 5)
+# Per pid: a restarted scanner's file must not shadow the previous one's
+PROCESS_NAME = f"{'scanner' if ROLE == 'scanner' else 'web'}-{os.getpid()}"
+
+def build_metrics():
+    return {"process": PROCESS_NAME, "metrics": registry.collect()}
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def cluster_metrics():
+    collections = {PROCESS_NAME: registry.collect()}
+    for path in glob.glob(METRICS_PREFIX + "*"):
+        try:
+            pid = int(path[len(METRICS_PREFIX):])
+        except ValueError:
+            continue  # a publisher's temp file
+        if pid == os.getpid():
+            continue
+        try:
+            with open(path, "rb") as f:
+                published = json.loads(f.read())
+        except (OSError, ValueError) as e:
+            print("Metrics read error:", e)
+            continue
+        entries = published["metrics"]
+        if not pid_alive(pid):
+            # Keep an exited worker's counts so totals don't go backwards;
+            # its gauges no longer describe anything
+            entries = [e for e in entries if e["kind"] != "gauge"]
+        collections[published["process"]] = entries
+    return merge_metrics(collections)
+
+if ROLE in ("scanner", "web"):
+    metrics_publisher = SnapshotPublisher(f"{METRICS_PREFIX}{os.getpid()}", build_metrics, None,
+                                          max_interval=METRICS_INTERVAL).start()
+
+if IS_WEB:
+    control = ControlClient(IPC_SOCKET, IPC_KEY)
+    follower = SnapshotFollower(SNAPSHOT_FILE, load_snapshot).start()
+    tokens_follower = SnapshotFollower(TOKENS_SNAPSHOT_FILE, load_tokens_snapshot, interval=0.5).start()
+    registry.gauge("axiom_snapshot_age_seconds", "Seconds since the scanner published the loaded snapshot",
+                   snapshot_age)
+
+    def served_from_snapshot():
+        # The tokens snapshot covers /series_stats and the default /tokens chart
+        if tokens_state["payload"] is None:
+            return False
+        return request.endpoint == "series_stats" or (
+            request.endpoint == "tokens_route" and tokens_params() == TOKENS_DEFAULT_PARAMS)
+
+    @app.before_request
+    def forward_to_scanner():
+        if request.endpoint not in SCANNER_ENDPOINTS or served_from_snapshot():
+            return None
+        try:
+            reply = control.request({"method": request.method, "path": request.path,
+                                     "query_string": request.query_string.decode(), "data": request.get_data(),
+                                     "content_type": request.content_type,
+                                     "headers": {k: v for k, v in request.headers.items() if k == "If-None-Match"}})
+        except (OSError, EOFError) as e:
+            return jsonify({"error": f"Scanner unavailable: {e}"}), 503
+        # Apply our own change right away instead of waiting for the next poll
+        if request.method != "GET":
+            follower.refresh()
+            tokens_follower.refresh()
+        return Response(reply["body"], status=reply["status"], headers=reply["headers"])
+
+@app.route("/health", methods=["GET"])
+def health():
+    if not IS_WEB:
+        return jsonify({"role": ROLE, "ok": True})
+    age = snapshot_age()
+    ok = age is not None and age < SNAPSHOT_STALE_SECONDS
+    return jsonify({"role": ROLE, "ok": ok, "snapshot_age": None if age is None else round(age, 3),
+                    "snapshot_stale_after": SNAPSHOT_STALE_SECONDS}), 200 if ok else 503
+
+def serve_scanner():
+    ControlServer(IPC_SOCKET, IPC_KEY, handle_control).start()
+    print("SCANNER LISTENING ON:", IPC_SOCKET, "SNAPSHOT:", SNAPSHOT_FILE)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    while True:
+        time.sleep(3600)
+
 # -------------------------------
 # Run server
 # -------------------------------
 if __name__ == "__main__":
-    app.run(debug=True, port=5001)
+    if ROLE == "scanner":
+        serve_scanner()
+    else:
+        # The scheduler and its jobs start at import; the reloader's child
+        # would import the module again and run them twice.
+        app.run(debug=True, port=5001, use_reloader=False)
@@ -0,0 +1,323 @@
+import json
+import mmap
+import os
+import threading
+import time
+
+# -------------------------------
+# Sequenced event store
+# -------------------------------
+# Every appended event gets the next value of one store-wide sequence
+# number, so a single cursor can resume any mix of channels. Readers ask
+# for "everything after seq N"; the SSE stream blocks on the condition
+# until something newer than its cursor arrives. With a journal attached,
+# every event is also written to an append-only JSONL file and the recent
+# tail is replayed on startup.
+
+class RingBuffer:
+    # Fixed-capacity (seq, item) slots; seqs only increase, so lookups by
+    # cursor are a binary search over the logical order.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._seqs = [0] * capacity
+        self._items = [None] * capacity
+        self._start = 0
+        self._count = 0
+
+    def append(self, seq, item):
+        idx = (self._start + self._count) % self.capacity
+        self._seqs[idx] = seq
+        self._items[idx] = item
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def __len__(self):
+        return self._count
+
+    def last_seq(self):
+        if not self._count:
+            return 0
+        return self._seqs[(self._start + self._count - 1) % self.capacity]
+
+    def after(self, since=None):
+        lo = 0
+        if since is not None:
+            hi = self._count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._seqs[(self._start + mid) % self.capacity] <= since:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        out = []
+        for i in range(lo, self._count):
+            idx = (self._start + i) % self.capacity
+            out.append((self._seqs[idx], self._items[idx]))
+        return out
+
+
+class Channel:
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def append(self, item):
+        return self.store.append(self.name, item)
+
+    def __iter__(self):
+        return iter(self.store.items(self.name)[0])
+
+    def __len__(self):
+        return self.store.size(self.name)
+
+
+class EventStore:
+    def __init__(self, capacity=50, journal=None):
+        self.capacity = capacity
+        self.journal = journal
+        self.epoch = f"{int(time.time()):x}"
+        self._buffers = {}
+        self._seq = 0
+        self._cond = threading.Condition()
+        if journal is not None:
+            journal.on_oversize = self.compact
+
+    def channel(self, name):
+        with self._cond:
+            self._buffers.setdefault(name, RingBuffer(self.capacity))
+        return Channel(self, name)
+
+    def append(self, name, item):
+        with self._cond:
+            self._seq += 1
+            self._buffers[name].append(self._seq, item)
+            if self.journal is not None:
+                self.journal.append({"seq": self._seq, "ch": name, "ts": round(time.time(), 3), "data": item})
+            self._cond.notify_all()
+            return self._seq
+
+    def last_seq(self, name=None):
+        with self._cond:
+            if name is None:
+                return self._seq
+            buf = self._buffers.get(name)
+            return buf.last_seq() if buf else 0
+
+    def size(self, name):
+        with self._cond:
+            return len(self._buffers.get(name, ()))
+
+    def items(self, name, since=None):
+        # Returns (items newer than since, store seq at read time)
+        with self._cond:
+            return [item for _, item in self._after(name, since)], self._seq
+
+    def events_since(self, since, names):
+        with self._cond:
+            return self._merged(since, names)
+
+    def wait_for(self, since, names, timeout=15.0):
+        # Blocks until an event newer than since lands (or timeout)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                remaining = deadline - time.monotonic()
+                if not self._cond.wait_for(lambda: self._seq > since, timeout=max(remaining, 0)):
+                    return []
+                events = self._merged(since, names)
+                if events:
+                    return events
+                # Only other channels moved on; skip past them
+                since = self._seq
+
+    def replay(self):
+        # Refill the rings from the journal tail; call after registering channels
+        if self.journal is None:
+            return 0
+        with self._cond:
+            records = self.journal.read_tail(set(self._buffers), self.capacity)
+            for rec in records:
+                self._buffers[rec["ch"]].append(rec["seq"], rec["data"])
+            if records:
+                self._seq = max(self._seq, records[-1]["seq"])
+            return len(records)
+
+    def export(self):
+        # (epoch, seq, [[seq, channel, item], ...]) for publishing a snapshot
+        with self._cond:
+            return self.epoch, self._seq, [list(e) for e in self._merged(None, list(self._buffers))]
+
+    def load(self, records, seq, epoch):
+        # Replace the ring contents with a published snapshot (read-only copies)
+        with self._cond:
+            for name in self._buffers:
+                self._buffers[name] = RingBuffer(self.capacity)
+            for rseq, name, item in records:
+                if name in self._buffers:
+                    self._buffers[name].append(rseq, item)
+            self._seq = seq
+            self.epoch = epoch
+            self._cond.notify_all()
+
+    def compact(self):
+        # Rotate the journal, seeding the new file with what the rings hold
+        with self._cond:
+            records = [{"seq": seq, "ch": name, "ts": None, "data": item}
+                       for seq, name, item in self._merged(None, list(self._buffers))]
+            self.journal.rotate(records)
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def _merged(self, since, names):
+        events = [(seq, name, item) for name in names for seq, item in self._after(name, since)]
+        events.sort(key=lambda e: e[0])
+        return events
+
+    def _after(self, name, since):
+        buf = self._buffers.get(name)
+        return buf.after(since) if buf else []
+
+
+# -------------------------------
+# Append-only JSONL journal
+# -------------------------------
+# fsync modes: "always" flushes and fsyncs on every append, "batch" buffers
+# appends and fsyncs once per flush (every flush_interval seconds or
+# batch_size records), "never" leaves syncing to the OS.
+
+class Journal:
+    def __init__(self, path, fsync="batch", flush_interval=0.5, batch_size=256,
+                 max_bytes=16 * 1024 * 1024, keep=3):
+        self.path = path
+        self.fsync = fsync
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.on_oversize = None
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._fh = open(path, "ab")
+        self.stats = {"appended": 0, "flushes": 0, "rotations": 0, "replayed": 0}
+        if fsync != "always":
+            threading.Thread(target=self._flusher, daemon=True, name="journal-flush").start()
+
+    def append(self, record):
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+        with self._lock:
+            self.stats["appended"] += 1
+            if self.fsync == "always":
+                self._fh.write(line)
+                self._sync()
+            else:
+                self._pending.append(line)
+                if len(self._pending) >= self.batch_size:
+                    self._wake.set()
+        if self.fsync == "always":
+            self._check_size()
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._fh.write(b"".join(self._pending))
+                self._pending.clear()
+                self._sync()
+
+    def size(self):
+        with self._lock:
+            return self._fh.tell()
+
+    def rotate(self, records):
+        with self._lock:
+            # Pending lines are already in the caller's snapshot or too old
+            # to keep; the full history goes to the .1 archive either way.
+            if self._pending:
+                self._fh.write(b"".join(self._pending))
+                self._pending.clear()
+            self._fh.close()
+            for i in range(self.keep - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            if self.keep > 0:
+                os.replace(self.path, f"{self.path}.1")
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(b"".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+                                 for r in records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._fh = open(self.path, "ab")
+            self.stats["rotations"] += 1
+
+    def read_tail(self, channels, per_channel, max_scan_bytes=8 * 1024 * 1024):
+        # Reverse scan over a memory map: only the lines needed to fill each
+        # channel's ring are decoded, and a channel that never fills up stops
+        # the scan after max_scan_bytes rather than walking the whole file.
+        with self._lock:
+            if self._pending:
+                self._fh.write(b"".join(self._pending))
+                self._pending.clear()
+            self._fh.flush()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return []
+        wanted = {ch: per_channel for ch in channels}
+        records, seen = [], set()
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            floor = max(0, end - max_scan_bytes)
+            while end > floor and any(wanted.values()):
+                start = mm.rfind(b"\n", 0, end - 1) + 1
+                line = mm[start:end].strip()
+                end = start
+                # Skip lines for full channels without decoding them
+                at = line.find(b'"ch":"')
+                if at < 0 or not wanted.get(line[at + 6:line.find(b'"', at + 6)].decode()):
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn write at the tail
+                ch = rec.get("ch")
+                if wanted.get(ch) and rec["seq"] not in seen:
+                    seen.add(rec["seq"])
+                    wanted[ch] -= 1
+                    records.append(rec)
+        records.sort(key=lambda r: r["seq"])
+        self.stats["replayed"] = len(records)
+        return records
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        with self._lock:
+            self._fh.close()
+
+    def _sync(self):
+        self._fh.flush()
+        self.stats["flushes"] += 1
+        if self.fsync != "never":
+            os.fsync(self._fh.fileno())
+
+    def _check_size(self):
+        if self.on_oversize is not None and self.size() > self.max_bytes:
+            self.on_oversize()
+
+    def _flusher(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+                self._check_size()
+            except Exception as e:
+                print("Journal flush error:", e)
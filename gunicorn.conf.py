@@ -0,0 +1,108 @@
+import glob
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+# -------------------------------
+# Multi-worker deployment
+# -------------------------------
+#   gunicorn -c gunicorn.conf.py
+# The master starts one scanner process (AXIOM_ROLE=scanner) that runs the
+# bot/sniper jobs and owns all state; the web workers (AXIOM_ROLE=web) read
+# its snapshot and forward control requests to it over a Unix socket. The
+# master restarts the scanner if it dies, backing off while it keeps
+# crashing; workers report the snapshot's age on /health meanwhile.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+wsgi_app = "dashboard:app"
+bind = os.environ.get("AXIOM_BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 2))
+# Each open /stream holds a thread; dashboard.py caps streams at half the
+# threads per worker (STREAM_LIMIT) so plain requests always get through
+worker_class = "gthread"
+threads = int(os.environ.get("AXIOM_THREADS", 16))
+raw_env = ["AXIOM_ROLE=web", f"AXIOM_THREADS={threads}"]
+preload_app = False
+
+RESTART_BACKOFF_MAX = 30
+# A scanner that stayed up this long was healthy; the backoff starts over
+RESTART_RESET_AFTER = 60
+
+scanner = None
+stopping = threading.Event()
+
+
+def start_scanner():
+    global scanner
+    env = dict(os.environ, AXIOM_ROLE="scanner")
+    scanner = subprocess.Popen([sys.executable, os.path.join(BASE_DIR, "dashboard.py")], env=env, cwd=BASE_DIR)
+    return scanner
+
+
+def supervise(server):
+    delay = 1
+    while True:
+        started = time.monotonic()
+        code = scanner.wait()
+        if stopping.is_set():
+            return
+        if time.monotonic() - started > RESTART_RESET_AFTER:
+            delay = 1
+        server.log.error("Scanner exited with code %s; restarting in %ss", code, delay)
+        if stopping.wait(delay):
+            return
+        start_scanner()
+        server.log.info("Scanner restarted (pid %s)", scanner.pid)
+        delay = min(delay * 2, RESTART_BACKOFF_MAX)
+
+
+def on_starting(server):
+    # Fresh key per deployment so nothing else on the box can drive the bot
+    os.environ.setdefault("AXIOM_IPC_KEY", secrets.token_hex(16))
+    sys.path.insert(0, BASE_DIR)
+    from cluster import ipc_settings
+    snapshot, socket_path, _ = ipc_settings()
+    for stale in [snapshot, f"{snapshot}.tokens", socket_path] + glob.glob(f"{snapshot}.metrics.*"):
+        if os.path.exists(stale):
+            os.unlink(stale)
+
+    start_scanner()
+    deadline = time.monotonic() + 30
+    while not (os.path.exists(socket_path) and os.path.exists(snapshot)):
+        if scanner.poll() is not None:
+            raise RuntimeError(f"Scanner exited with code {scanner.returncode}")
+        if time.monotonic() > deadline:
+            raise RuntimeError("Scanner did not come up within 30s")
+        time.sleep(0.1)
+    server.log.info("Scanner running (pid %s)", scanner.pid)
+    threading.Thread(target=supervise, args=(server,), daemon=True, name="scanner-supervisor").start()
+
+
+def post_worker_init(worker):
+    # End open /stream responses on SIGTERM so a graceful stop doesn't wait
+    # out graceful_timeout on them
+    import dashboard
+    handle_exit = worker.handle_exit
+
+    def close_streams(sig, frame):
+        dashboard.streams_closing.set()
+        handle_exit(sig, frame)
+    signal.signal(signal.SIGTERM, close_streams)
+
+
+def on_exit(server):
+    stopping.set()
+    if scanner is not None and scanner.poll() is None:
+        scanner.terminate()
+        try:
+            scanner.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            scanner.kill()
+    from cluster import ipc_settings
+    for path in glob.glob(f"{ipc_settings()[0]}.metrics.*"):
+        os.unlink(path)
@@ -0,0 +1,13 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+# -------------------------------
+# Pooled keep-alive HTTP sessions
+# -------------------------------
+def make_session(pool_size=10, user_agent="axiom-dashboard"):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": user_agent, "Connection": "keep-alive"})
+    return session
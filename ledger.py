@@ -0,0 +1,231 @@
+import queue
+import sqlite3
+import threading
+import time
+
+# -------------------------------
+# SQLite trade ledger
+# -------------------------------
+# Trades are queued and written by a single writer thread in batches, one
+# transaction per batch. The same transaction folds the batch into the
+# token_pnl / wallet_pnl aggregate tables, so P&L reads never scan trades.
+# WAL mode lets request threads read (each on its own connection) while
+# the writer commits.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id      INTEGER PRIMARY KEY,
+    ts      REAL NOT NULL,
+    token   TEXT NOT NULL,
+    action  TEXT NOT NULL,
+    usd     REAL NOT NULL,
+    pl_pct  REAL NOT NULL,
+    profit  REAL NOT NULL,
+    wallet  TEXT NOT NULL,
+    source  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades(ts);
+CREATE INDEX IF NOT EXISTS idx_trades_token_ts ON trades(token, ts);
+CREATE INDEX IF NOT EXISTS idx_trades_action_ts ON trades(action, ts);
+
+CREATE TABLE IF NOT EXISTS token_pnl (
+    token   TEXT PRIMARY KEY,
+    trades  INTEGER NOT NULL,
+    buys    INTEGER NOT NULL,
+    sells   INTEGER NOT NULL,
+    volume  REAL NOT NULL,
+    profit  REAL NOT NULL,
+    last_ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_token_pnl_profit ON token_pnl(profit);
+
+CREATE TABLE IF NOT EXISTS wallet_pnl (
+    wallet  TEXT PRIMARY KEY,
+    trades  INTEGER NOT NULL,
+    volume  REAL NOT NULL,
+    profit  REAL NOT NULL,
+    last_ts REAL NOT NULL
+);
+"""
+
+UPSERT_TOKEN = """
+INSERT INTO token_pnl (token, trades, buys, sells, volume, profit, last_ts) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(token) DO UPDATE SET
+    trades = trades + excluded.trades, buys = buys + excluded.buys, sells = sells + excluded.sells,
+    volume = volume + excluded.volume, profit = profit + excluded.profit,
+    last_ts = max(last_ts, excluded.last_ts)
+"""
+
+UPSERT_WALLET = """
+INSERT INTO wallet_pnl (wallet, trades, volume, profit, last_ts) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(wallet) DO UPDATE SET
+    trades = trades + excluded.trades, volume = volume + excluded.volume,
+    profit = profit + excluded.profit, last_ts = max(last_ts, excluded.last_ts)
+"""
+
+TRADE_COLUMNS = "id, ts, token, action, usd, pl_pct, profit, wallet, source"
+
+
+def _connect(path, readonly=False):
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class TradeLedger:
+    def __init__(self, path, batch_size=500, flush_interval=0.5, writer=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        # Without a writer this is a read-only handle (web workers); the
+        # scanner process owns the schema and all writes
+        self.readonly = not writer
+        self._closed = self.readonly
+        self.stats = {"inserted": 0, "batches": 0, "last_batch_ms": 0.0}
+        if writer:
+            self._writer = _connect(path)
+            self._writer.executescript(SCHEMA)
+            self._thread = threading.Thread(target=self._write_loop, daemon=True, name="ledger-writer")
+            self._thread.start()
+
+    # ---- writes ----
+    def record(self, ts, token, action, usd, pl_pct, wallet, source=None):
+        if self.readonly:
+            raise RuntimeError("Ledger opened read-only")
+        profit = round(usd * pl_pct / 100, 6)
+        self._queue.put((ts, token, action, usd, pl_pct, profit, wallet, source))
+
+    def flush(self):
+        # Blocks until everything queued so far is committed
+        if self.readonly:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def close(self):
+        if not self._closed:
+            self.flush()
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def insert_many(self, rows):
+        # rows: (ts, token, action, usd, pl_pct, profit, wallet, source)
+        started = time.perf_counter()
+        tokens, wallets = {}, {}
+        for ts, token, action, usd, pl_pct, profit, wallet, _ in rows:
+            t = tokens.setdefault(token, [0, 0, 0, 0.0, 0.0, 0.0])
+            t[0] += 1
+            t[1 if action == "Buy" else 2] += 1
+            t[3] += usd
+            t[4] += profit
+            t[5] = max(t[5], ts)
+            w = wallets.setdefault(wallet, [0, 0.0, 0.0, 0.0])
+            w[0] += 1
+            w[1] += usd
+            w[2] += profit
+            w[3] = max(w[3], ts)
+        with self._writer:
+            self._writer.executemany(
+                "INSERT INTO trades (ts, token, action, usd, pl_pct, profit, wallet, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows)
+            self._writer.executemany(UPSERT_TOKEN, [(k, *v) for k, v in tokens.items()])
+            self._writer.executemany(UPSERT_WALLET, [(k, *v) for k, v in wallets.items()])
+        self.stats["inserted"] += len(rows)
+        self.stats["batches"] += 1
+        self.stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            batch, waiters, stop = [], [], False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=self.flush_interval if batch else 0)
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.insert_many(batch)
+                except sqlite3.Error as e:
+                    print("Ledger write error:", e)
+            for w in waiters:
+                w.set()
+            if stop:
+                self._writer.close()
+                return
+
+    # ---- reads ----
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path, readonly=self.readonly)
+        return conn
+
+    def query(self, token=None, action=None, start=None, end=None, cursor=None, limit=50):
+        # Keyset pagination, newest first. cursor is the "ts:id" of the last
+        # row of the previous page; returns (rows, next_cursor).
+        where, args = [], []
+        if token:
+            where.append("token = ?")
+            args.append(token)
+        if action:
+            where.append("action = ?")
+            args.append(action)
+        if start is not None:
+            where.append("ts >= ?")
+            args.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            args.append(end)
+        if cursor:
+            ts, rowid = cursor.split(":")
+            where.append("(ts, id) < (?, ?)")
+            args.extend([float(ts), int(rowid)])
+        sql = f"SELECT {TRADE_COLUMNS} FROM trades"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        args.append(limit)
+        rows = [dict(r) for r in self._reader().execute(sql, args)]
+        next_cursor = f"{rows[-1]['ts']!r}:{rows[-1]['id']}" if len(rows) == limit else None
+        return rows, next_cursor
+
+    def wallet_pnl(self):
+        return [dict(r) for r in self._reader().execute(
+            "SELECT wallet, trades, volume, profit, last_ts FROM wallet_pnl ORDER BY wallet")]
+
+    def token_pnl(self, token=None, top=10):
+        conn = self._reader()
+        if token:
+            row = conn.execute("SELECT * FROM token_pnl WHERE token = ?", (token,)).fetchone()
+            return [dict(row)] if row else []
+        best = conn.execute("SELECT * FROM token_pnl ORDER BY profit DESC LIMIT ?", (top,)).fetchall()
+        worst = conn.execute("SELECT * FROM token_pnl ORDER BY profit ASC LIMIT ?", (top,)).fetchall()
+        return {"best": [dict(r) for r in best], "worst": [dict(r) for r in worst]}
+
+    def totals(self):
+        row = self._reader().execute(
+            "SELECT COALESCE(SUM(trades), 0) AS trades, COALESCE(SUM(volume), 0) AS volume, "
+            "COALESCE(SUM(profit), 0) AS profit FROM wallet_pnl").fetchone()
+        return dict(row)
@@ -0,0 +1,254 @@
+import threading
+import time
+from bisect import bisect_left
+
+# -------------------------------
+# Lightweight Prometheus metrics
+# -------------------------------
+# Counters and histograms record into a per-thread shard with no locking on
+# the hot path; shards are merged when /metrics is scraped. Shards of
+# threads that have exited are folded into a retired total (whenever a new
+# thread registers, and at scrape time) so short-lived request threads
+# don't pile up. Gauges and externally kept counters are
+# read through callbacks at scrape time.
+#
+# Registry.collect() returns the same values as plain data, so several
+# processes can publish theirs and one of them render the merge: counters
+# and histograms are summed, gauges keep one series per process.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                # New threads are where dead ones come from, so retire them
+                # here too; otherwise shards pile up until the next scrape
+                self._retire_dead()
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _new_cell(self):
+        raise NotImplementedError
+
+    def _merged(self):
+        with self._lock:
+            self._retire_dead()
+            total = {}
+            self._fold(total, self._retired)
+            for _, shard in self._shards:
+                self._fold(total, shard)
+        return total
+
+    def _retire_dead(self):
+        # Caller holds the lock
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._fold(self._retired, shard)
+        self._shards = live
+
+    def _fold(self, into, shard):
+        for labels, cell in list(shard.items()):
+            acc = into.get(labels)
+            if acc is None:
+                acc = into[labels] = self._new_cell()
+            for i, v in enumerate(cell):
+                acc[i] += v
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def _new_cell(self):
+        return [0]
+
+    def inc(self, labels=(), amount=1):
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            cell = shard[labels] = [0]
+        cell[0] += amount
+
+    def collect(self):
+        return {labels: value for labels, (value,) in self._merged().items()}
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "started")
+
+    def __init__(self, hist, labels):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.started, self.labels)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_cell(self):
+        # One slot per bucket, one overflow (+Inf) slot, then the sum
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value, labels=()):
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            cell = shard[labels] = self._new_cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def time(self, labels=()):
+        return _Timer(self, labels)
+
+    def collect(self):
+        return self._merged()
+
+
+class Callback:
+    # Values read at scrape time; fn returns a number or {label_tuple: number}
+    def __init__(self, name, help_text, fn, kind="gauge", labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+
+    def collect(self):
+        value = self.fn()
+        if not isinstance(value, dict):
+            value = {(): value}
+        return {labels: v for labels, v in value.items() if v is not None}
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, fn, labelnames=()):
+        return self._add(Callback(name, help_text, fn, "gauge", labelnames))
+
+    def counter_callback(self, name, help_text, fn, labelnames=()):
+        return self._add(Callback(name, help_text, fn, "counter", labelnames))
+
+    def collect(self):
+        # [{"name", "help", "kind", "labelnames", "buckets", "samples": [[labels, value], ...]}];
+        # a histogram's value is its bucket counts, overflow count and sum
+        entries = []
+        for m in self._metrics:
+            entry = {"name": m.name, "help": m.help, "kind": m.kind, "labelnames": list(m.labelnames),
+                     "buckets": list(getattr(m, "buckets", ())), "samples": []}
+            try:
+                entry["samples"] = [[list(labels), value] for labels, value in m.collect().items()]
+            except Exception as e:
+                entry["error"] = str(e)
+            entries.append(entry)
+        return entries
+
+    def render(self):
+        return render(self.collect())
+
+
+def merge(collections):
+    # collections: {process: Registry.collect()}. Counters and histograms are
+    # summed over processes; gauges get a "process" label instead, since
+    # adding up e.g. thread counts or queue depths means nothing.
+    merged = {}
+    for process, entries in collections.items():
+        for entry in entries:
+            gauge = entry["kind"] == "gauge"
+            m = merged.get(entry["name"])
+            if m is None:
+                m = merged[entry["name"]] = dict(entry, samples={})
+                m.pop("error", None)
+                if gauge:
+                    m["labelnames"] = m["labelnames"] + ["process"]
+            if "error" in entry:
+                m["error"] = f"{process}: {entry['error']}"
+            for labels, value in entry["samples"]:
+                key = tuple(labels) + ((process,) if gauge else ())
+                acc = m["samples"].get(key)
+                if acc is None:
+                    m["samples"][key] = value
+                elif isinstance(value, list):
+                    m["samples"][key] = [a + b for a, b in zip(acc, value)]
+                else:
+                    m["samples"][key] = acc + value
+    return [dict(m, samples=list(m["samples"].items())) for m in merged.values()]
+
+
+def render(entries):
+    # Prometheus text format for Registry.collect() or merge() output
+    lines = []
+    for entry in entries:
+        name, labelnames = entry["name"], entry["labelnames"]
+        lines.append(f"# HELP {name} {entry['help']}")
+        lines.append(f"# TYPE {name} {entry['kind']}")
+        for labels, value in sorted((tuple(labels), value) for labels, value in entry["samples"]):
+            if entry["kind"] != "histogram":
+                lines.append(f"{name}{_labels(labelnames, labels)} {_num(value)}")
+                continue
+            running = 0
+            for bound, n in zip(tuple(entry["buckets"]) + (float("inf"),), value):
+                running += n
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{name}_bucket{_labels(labelnames, labels, le)} {running}")
+            lines.append(f"{name}_sum{_labels(labelnames, labels)} {_num(value[-1])}")
+            lines.append(f"{name}_count{_labels(labelnames, labels)} {running}")
+        if "error" in entry:
+            lines.append(f"# error collecting {name}: {_escape(entry['error'])}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,241 @@
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from http_pool import make_session
+
+# -------------------------------
+# Solana JSON-RPC client
+# -------------------------------
+# Calls made within batch_window of each other are coalesced into one
+# JSON-RPC batch request over a pooled keep-alive session. Identical calls
+# share one in-flight request, and slow-changing results are cached for a
+# per-method TTL. With several endpoints configured, each batch goes to the
+# endpoint with the lowest measured latency; failing endpoints cool down
+# and the batch fails over to the next one.
+
+DEFAULT_CACHE_TTLS = {
+    "getSlot": 0.4,
+    "getBalance": 2.0,
+    "getTokenAccountsByOwner": 5.0,
+    "getTokenLargestAccounts": 30.0,
+    "getTokenSupply": 60.0,
+}
+
+
+class RpcError(Exception):
+    pass
+
+
+class Endpoint:
+    def __init__(self, url):
+        self.url = url
+        self.latency = None
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.stats = {"requests": 0, "errors": 0, "last_error": None, "max_latency_ms": 0.0}
+
+    def record_ok(self, elapsed):
+        self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+        self.failures = 0
+        self.stats["requests"] += 1
+        self.stats["max_latency_ms"] = round(max(self.stats["max_latency_ms"], elapsed * 1000), 3)
+
+    def record_error(self, error):
+        self.failures += 1
+        self.cooldown_until = time.monotonic() + min(30.0, 2 ** (self.failures - 1))
+        self.stats["requests"] += 1
+        self.stats["errors"] += 1
+        self.stats["last_error"] = str(error)
+
+    def snapshot(self):
+        return dict(self.stats, url=self.url,
+                    latency_ms=round(self.latency * 1000, 3) if self.latency is not None else None,
+                    cooling_for=round(max(0.0, self.cooldown_until - time.monotonic()), 3))
+
+
+class RpcClient:
+    def __init__(self, urls, limiter=None, batch_window=0.005, max_batch=50, timeout=10,
+                 cache_ttls=None, pool_size=10, on_request=None):
+        self.on_request = on_request
+        self.endpoints = [Endpoint(u) for u in urls if u]
+        self.limiter = limiter
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS, **(cache_ttls or {}))
+        self.session = make_session(pool_size=pool_size)
+        self._ids = itertools.count(1)
+        self._pending = []
+        self._cache = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._senders = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="rpc-send")
+        self.stats = {"calls": 0, "cache_hits": 0, "coalesced": 0, "http_requests": 0,
+                      "batched_calls": 0, "failovers": 0, "errors": 0}
+        threading.Thread(target=self._batcher, daemon=True, name="rpc-batcher").start()
+
+    # ---- public API ----
+    def call_async(self, method, params=None):
+        key = (method, json.dumps(params, sort_keys=True))
+        fut = Future()
+        with self._cond:
+            self.stats["calls"] += 1
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self.stats["cache_hits"] += 1
+                fut.set_result(cached[1])
+                return fut
+            shared = self._inflight.get(key)
+            if shared is not None:
+                self.stats["coalesced"] += 1
+                return shared
+            if not self.endpoints:
+                fut.set_exception(RpcError("No RPC_URL set in config.json"))
+                return fut
+            self._inflight[key] = fut
+            self._pending.append((key, method, params, fut))
+            self._cond.notify()
+        return fut
+
+    def call(self, method, params=None, timeout=None):
+        return self.call_async(method, params).result(timeout or self.timeout * 2)
+
+    def get_slot(self):
+        return self.call("getSlot")
+
+    def get_balance(self, address):
+        return self.call("getBalance", [address])["value"]
+
+    def get_token_accounts(self, owner):
+        return self.call("getTokenAccountsByOwner",
+                         [owner, {"programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"},
+                          {"encoding": "jsonParsed"}])["value"]
+
+    def top_holder_percents(self, mints):
+        # Share of supply held by the largest account, per mint; None where
+        # the lookup failed. All lookups are issued at once so they batch.
+        futures = {m: (self.call_async("getTokenLargestAccounts", [m]),
+                       self.call_async("getTokenSupply", [m])) for m in mints}
+        result = {}
+        for mint, (largest_f, supply_f) in futures.items():
+            try:
+                largest = largest_f.result(self.timeout * 2)["value"]
+                supply = float(supply_f.result(self.timeout * 2)["value"]["uiAmount"] or 0)
+                top = float(largest[0]["uiAmount"] or 0) if largest else 0.0
+                result[mint] = round(top / supply * 100, 2) if supply else None
+            except Exception:
+                result[mint] = None
+        return result
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, pending=len(self._pending), cached=len(self._cache),
+                        endpoints=[e.snapshot() for e in self.endpoints])
+
+    # ---- batching ----
+    def _batcher(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let concurrent callers pile on before sending
+            time.sleep(self.batch_window)
+            with self._cond:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            self._senders.submit(self._send, batch)
+
+    def _send(self, batch):
+        ids = {}
+        payload = []
+        for key, method, params, fut in batch:
+            rid = next(self._ids)
+            ids[rid] = (key, method, fut)
+            call = {"jsonrpc": "2.0", "id": rid, "method": method}
+            if params is not None:
+                call["params"] = params
+            payload.append(call)
+
+        try:
+            responses = self._post(payload)
+        except Exception as e:
+            self._finish(ids, {}, RpcError(str(e)))
+            return
+        self._finish(ids, {r.get("id"): r for r in responses}, None)
+
+    def _post(self, payload):
+        last_error = None
+        for attempt, endpoint in enumerate(self._ranked_endpoints()):
+            if attempt:
+                with self._lock:
+                    self.stats["failovers"] += 1
+            if self.limiter is not None and not self.limiter.acquire(timeout=self.timeout):
+                raise RpcError("RPC rate limit wait timed out")
+            started = time.monotonic()
+            try:
+                r = self.session.post(endpoint.url, json=payload, timeout=self.timeout)
+                if r.status_code == 429 and self.limiter is not None:
+                    self.limiter.pause(float(r.headers.get("Retry-After", 1) or 1))
+                r.raise_for_status()
+                data = r.json()
+                if isinstance(data, dict):
+                    # Some providers answer a whole bad batch with one error
+                    raise RpcError(data.get("error", {}).get("message", "unexpected response"))
+            except Exception as e:
+                with self._lock:
+                    endpoint.record_error(e)
+                if self.on_request is not None:
+                    self.on_request(time.monotonic() - started, "error")
+                last_error = e
+                continue
+            elapsed = time.monotonic() - started
+            if self.on_request is not None:
+                self.on_request(elapsed, "ok")
+            with self._lock:
+                endpoint.record_ok(elapsed)
+                self.stats["http_requests"] += 1
+                self.stats["batched_calls"] += len(payload)
+            return data
+        raise RpcError(f"All RPC endpoints failed: {last_error}")
+
+    def _ranked_endpoints(self):
+        now = time.monotonic()
+        with self._lock:
+            return sorted(self.endpoints, key=lambda e: (e.cooldown_until > now, e.latency or 0.0))
+
+    def _finish(self, ids, responses, error):
+        now = time.monotonic()
+        for rid, (key, method, fut) in ids.items():
+            resp = responses.get(rid)
+            if error is None and resp is not None and "error" not in resp:
+                ttl = self.cache_ttls.get(method)
+                with self._lock:
+                    if ttl:
+                        self._cache[key] = (now + ttl, resp.get("result"))
+                    self._inflight.pop(key, None)
+                fut.set_result(resp.get("result"))
+                continue
+            if error is None:
+                err = resp["error"] if resp is not None else {"message": "missing response"}
+                exc = RpcError(err.get("message", str(err)))
+            else:
+                exc = error
+            with self._lock:
+                self.stats["errors"] += 1
+                self._inflight.pop(key, None)
+            fut.set_exception(exc)
+        self._prune_cache(now)
+
+    def _prune_cache(self, now):
+        with self._lock:
+            if len(self._cache) > 4096:
+                for key in [k for k, v in self._cache.items() if v[0] <= now]:
+                    del self._cache[key]
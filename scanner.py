@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from scheduler import RateLimited
+
+# -------------------------------
+# Batched watchlist scanner
+# -------------------------------
+# Walks the whole watchlist per sweep. Fresh and stale cache entries are
+# served straight from the cache (stale ones are reloaded in the
+# background); misses are split into batches of up to batch_size addresses
+# and fetched on a bounded pool. Each batch is yielded as soon as it lands
+# so callers can act on results while the sweep runs. Tokens another sweep
+# is already fetching are waited for rather than fetched twice.
+
+class WatchlistScanner:
+    def __init__(self, fetch_batch, cache=None, batch_size=30, max_workers=4, wait_timeout=30.0):
+        self.fetch_batch = fetch_batch
+        self.cache = cache
+        self.batch_size = batch_size
+        self.wait_timeout = wait_timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan")
+        self._lock = threading.Lock()
+        self.stats = {"sweeps": 0, "tokens_scanned": 0, "batches": 0, "batch_errors": 0, "rate_limited": 0,
+                      "cache_served": 0, "refreshed": 0, "coalesced": 0, "last_sweep_tokens": 0, "last_sweep_seconds": 0.0,
+                      "avg_sweep_seconds": 0.0, "max_sweep_seconds": 0.0}
+
+    def sweep(self, tokens):
+        started = time.monotonic()
+        tokens = list(dict.fromkeys(tokens))
+        if self.cache:
+            served, pending, refresh, waiting = self.cache.plan(tokens)
+        else:
+            served, pending, refresh, waiting = [], tokens, [], []
+
+        # Misses go first on the pool; stale reloads queue behind them
+        futures = [self.pool.submit(self._fetch, chunk) for chunk in self._chunks(pending)]
+        for chunk in self._chunks(refresh):
+            self.pool.submit(self._refresh, chunk)
+        try:
+            if served:
+                yield served
+            for fut in as_completed(futures):
+                yield fut.result()
+            if waiting:
+                yield [(token, flight.value if flight.done.wait(self.wait_timeout) else None)
+                       for token, flight in waiting]
+        finally:
+            self._record(len(tokens), len(served), len(waiting), time.monotonic() - started)
+
+    def _chunks(self, tokens):
+        return [tokens[i:i + self.batch_size] for i in range(0, len(tokens), self.batch_size)]
+
+    def _fetch(self, chunk):
+        if self.cache:
+            self.cache.note_upstream_call()
+        try:
+            found = self.fetch_batch(chunk) or {}
+        except RateLimited:
+            # Leave the cache alone and let the scheduler back off the job
+            if self.cache:
+                self.cache.abandon(chunk)
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            raise
+        except Exception as e:
+            print("Batch fetch error:", e)
+            found = {}
+            with self._lock:
+                self.stats["batch_errors"] += 1
+        results = [(token, found.get(token)) for token in chunk]
+        if self.cache:
+            self.cache.complete(results)
+        with self._lock:
+            self.stats["batches"] += 1
+        return results
+
+    def _refresh(self, chunk):
+        try:
+            self._fetch(chunk)
+        except RateLimited:
+            return
+        with self._lock:
+            self.stats["refreshed"] += len(chunk)
+
+    def _record(self, n_tokens, n_cached, n_coalesced, elapsed):
+        with self._lock:
+            s = self.stats
+            s["sweeps"] += 1
+            s["tokens_scanned"] += n_tokens
+            s["cache_served"] += n_cached
+            s["coalesced"] += n_coalesced
+            s["last_sweep_tokens"] = n_tokens
+            s["last_sweep_seconds"] = round(elapsed, 4)
+            s["max_sweep_seconds"] = round(max(s["max_sweep_seconds"], elapsed), 4)
+            s["avg_sweep_seconds"] = round(s["avg_sweep_seconds"] + (elapsed - s["avg_sweep_seconds"]) / s["sweeps"], 4)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
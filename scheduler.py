@@ -0,0 +1,228 @@
+import heapq
+import itertools
+import queue
+import random
+import threading
+import time
+
+# -------------------------------
+# Rate limiting and backoff
+# -------------------------------
+class RateLimited(Exception):
+    def __init__(self, source, retry_after=None):
+        super().__init__(f"{source} rate limited")
+        self.source = source
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"acquired": 0, "waited_seconds": 0.0, "pauses": 0}
+
+    def _reserve(self):
+        # Caller holds the lock; returns seconds to wait (0 = got a token)
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self.stats["acquired"] += 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def try_acquire(self):
+        with self._lock:
+            return self._reserve() == 0.0
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                wait = self._reserve()
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            with self._lock:
+                self.stats["waited_seconds"] += wait
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # Upstream told us to back off (429); hold every caller for a while
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self.stats["pauses"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, rate=self.rate, burst=self.burst,
+                        paused_for=round(max(0.0, self._paused_until - time.monotonic()), 3))
+
+
+def backoff_delay(failures, base=1.0, cap=60.0):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(cap, base * (2 ** (failures - 1))))
+
+
+# -------------------------------
+# Scan scheduler
+# -------------------------------
+# Jobs are recurring functions run on a bounded worker pool. A job is in at
+# most one place at a time (waiting, ready or running), so start/stop can
+# be called any number of times without spawning copies. Due jobs are
+# picked by priority (lower runs first), so sniper scans jump ahead of
+# regular bot scans when workers are busy.
+
+class Job:
+    def __init__(self, name, fn, interval, priority=10):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.priority = priority
+        self.active = False
+        self.scheduled = False
+        self.failures = 0
+        self.stats = {"runs": 0, "errors": 0, "rate_limited": 0, "last_duration": 0.0,
+                      "last_error": None, "next_run_at": None}
+
+    def next_interval(self):
+        return self.interval() if callable(self.interval) else self.interval
+
+
+class Scheduler:
+    def __init__(self, workers=4):
+        self.workers = workers
+        self.jobs = {}
+        self.limiters = {}
+        self._delayed = []
+        self._ready = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started_at = None
+        self._threads = []
+
+    def register(self, name, fn, interval, priority=10):
+        self.jobs[name] = Job(name, fn, interval, priority)
+        return self.jobs[name]
+
+    def limiter(self, source, rate=None, burst=None):
+        if source not in self.limiters:
+            self.limiters[source] = TokenBucket(rate or 5, burst)
+        return self.limiters[source]
+
+    def start(self):
+        if self._started_at is not None:
+            return
+        self._started_at = time.monotonic()
+        self._threads.append(threading.Thread(target=self._dispatch, daemon=True, name="sched-dispatch"))
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(target=self._work, daemon=True, name=f"sched-worker-{i}"))
+        for t in self._threads:
+            t.start()
+
+    def start_job(self, name):
+        with self._lock:
+            job = self.jobs[name]
+            job.active = True
+            if not job.scheduled:
+                job.failures = 0
+                self._schedule(job, 0)
+        return job
+
+    def stop_job(self, name):
+        with self._lock:
+            job = self.jobs[name]
+            job.active = False
+        return job
+
+    def is_active(self, name):
+        return self.jobs[name].active
+
+    def _schedule(self, job, delay):
+        # Caller holds the lock
+        job.scheduled = True
+        run_at = time.monotonic() + delay
+        job.stats["next_run_at"] = run_at
+        heapq.heappush(self._delayed, (run_at, job.priority, next(self._counter), job.name))
+        self._wake.notify()
+
+    def _dispatch(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    _, priority, seq, name = heapq.heappop(self._delayed)
+                    self._ready.put((priority, seq, name))
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                self._wake.wait(timeout)
+
+    def _work(self):
+        while True:
+            _, _, name = self._ready.get()
+            job = self.jobs[name]
+            with self._lock:
+                if not job.active:
+                    job.scheduled = False
+                    continue
+                self._busy += 1
+            started = time.monotonic()
+            delay = None
+            try:
+                result = job.fn()
+                job.failures = 0
+                delay = result if isinstance(result, (int, float)) else job.next_interval()
+            except RateLimited as e:
+                job.failures += 1
+                job.stats["rate_limited"] += 1
+                job.stats["last_error"] = str(e)
+                delay = max(e.retry_after or 0, backoff_delay(job.failures))
+            except Exception as e:
+                job.failures += 1
+                job.stats["errors"] += 1
+                job.stats["last_error"] = repr(e)
+                print(f"Job {name} error:", e)
+                delay = backoff_delay(job.failures)
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._busy -= 1
+                    self._busy_seconds += elapsed
+                    job.stats["runs"] += 1
+                    job.stats["last_duration"] = round(elapsed, 4)
+                    if job.active:
+                        self._schedule(job, delay if delay is not None else job.next_interval())
+                    else:
+                        job.scheduled = False
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            uptime = now - self._started_at if self._started_at else 0.0
+            jobs = {}
+            for name, job in self.jobs.items():
+                stats = dict(job.stats, active=job.active, scheduled=job.scheduled,
+                             priority=job.priority, consecutive_failures=job.failures)
+                run_at = stats.pop("next_run_at")
+                stats["next_run_in"] = round(max(0.0, run_at - now), 3) if job.scheduled and run_at else None
+                jobs[name] = stats
+            return {
+                "workers": self.workers,
+                "busy_workers": self._busy,
+                "utilization": round(self._busy_seconds / (uptime * self.workers), 4) if uptime else 0.0,
+                "queue_depth": self._ready.qsize(),
+                "delayed": len(self._delayed),
+                "jobs": jobs,
+                "limiters": {k: v.snapshot() for k, v in self.limiters.items()},
+            }
@@ -0,0 +1,99 @@
+import importlib.util
+import json
+import os
+import secrets
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from stubs import StubConfig, dexscreener_stub, rpc_stub
+
+
+@pytest.fixture
+def dex():
+    server = dexscreener_stub(StubConfig()).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def rpc_server():
+    server = rpc_stub(StubConfig()).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def dashboard(tmp_path_factory):
+    # Standalone app on a throwaway config, journal and ledger. The module is
+    # imported once per session, so tests read cursors relative to what is
+    # already in the store.
+    tmp = tmp_path_factory.mktemp("standalone")
+    config = {"TOKENS": [], "DEMO_MODE": True, "STREAM_LIMIT": 2,
+              "JOURNAL_FILE": str(tmp / "events.jsonl"), "LEDGER_FILE": str(tmp / "trades.db")}
+    (tmp / "config.json").write_text(json.dumps(config))
+    saved = {k: os.environ.pop(k, None) for k in ("AXIOM_ROLE", "AXIOM_CONFIG")}
+    os.environ["AXIOM_CONFIG"] = str(tmp / "config.json")
+    try:
+        import dashboard
+    finally:
+        for k, v in saved.items():
+            os.environ.pop(k, None)
+            if v is not None:
+                os.environ[k] = v
+    return dashboard
+
+
+@pytest.fixture
+def client(dashboard):
+    return dashboard.app.test_client()
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture(scope="session")
+def cluster(tmp_path_factory):
+    # A real scanner process plus this process as a web worker, talking
+    # over a temporary socket and snapshot. The web side is a second copy
+    # of dashboard.py imported with AXIOM_ROLE=web.
+    tmp = tmp_path_factory.mktemp("cluster")
+    config = {"TOKENS": [], "DEMO_MODE": True, "METRICS_PUBLISH_INTERVAL": 0.2, "TOKENS_PUBLISH_INTERVAL": 0.2,
+              "JOURNAL_FILE": str(tmp / "events.jsonl"), "LEDGER_FILE": str(tmp / "trades.db")}
+    (tmp / "config.json").write_text(json.dumps(config))
+    env = {"AXIOM_CONFIG": str(tmp / "config.json"), "AXIOM_SNAPSHOT": str(tmp / "snapshot.json"),
+           "AXIOM_IPC": str(tmp / "scanner.sock"), "AXIOM_IPC_KEY": secrets.token_hex(16)}
+    scanner = subprocess.Popen([sys.executable, os.path.join(ROOT, "dashboard.py")], cwd=ROOT,
+                               env=dict(os.environ, AXIOM_ROLE="scanner", **env),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert wait_for(lambda: os.path.exists(env["AXIOM_IPC"]) and os.path.exists(env["AXIOM_SNAPSHOT"]))
+        saved = {k: os.environ.get(k) for k in list(env) + ["AXIOM_ROLE"]}
+        os.environ.update(env, AXIOM_ROLE="web")
+        try:
+            spec = importlib.util.spec_from_file_location("dashboard_web", os.path.join(ROOT, "dashboard.py"))
+            web = importlib.util.module_from_spec(spec)
+            sys.modules["dashboard_web"] = web
+            spec.loader.exec_module(web)
+        finally:
+            for k, v in saved.items():
+                os.environ.pop(k, None)
+                if v is not None:
+                    os.environ[k] = v
+        web.scanner_process = scanner
+        yield web
+    finally:
+        scanner.terminate()
+        scanner.wait(10)
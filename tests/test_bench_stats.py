@@ -0,0 +1,22 @@
+from bench_stats import nearest_rank, percentiles
+
+
+def test_nearest_rank():
+    ten = list(range(1, 11))
+    assert nearest_rank(ten, 0.50) == 5
+    assert nearest_rank(ten, 0.95) == 10
+    assert nearest_rank(ten, 0.99) == 10
+    hundred = list(range(1, 101))
+    assert [nearest_rank(hundred, q) for q in (0.5, 0.95, 0.99)] == [50, 95, 99]
+    assert nearest_rank([7], 0.5) == 7
+    # 0.57 * 100 is 56.99999999999999 in floating point
+    assert nearest_rank(hundred, 0.57) == 57
+
+
+def test_percentiles_in_milliseconds():
+    stats = percentiles([i / 1000 for i in range(1, 11)], elapsed=2.0)
+    assert stats["count"] == 10
+    assert (stats["p50_ms"], stats["p95_ms"], stats["p99_ms"]) == (5.0, 10.0, 10.0)
+    assert stats["mean_ms"] == 5.5 and stats["max_ms"] == 10.0
+    assert stats["per_second"] == 5.0
+    assert percentiles([]) == {"count": 0}
@@ -0,0 +1,174 @@
+import json
+import os
+import secrets
+import stat
+import subprocess
+import sys
+import time
+from multiprocessing import AuthenticationError
+
+import pytest
+
+from cluster import ControlClient, ControlServer, SnapshotFollower, SnapshotPublisher
+from conftest import ROOT, wait_for
+from event_store import EventStore
+from metrics import Registry
+from test_dashboard import route_count
+
+
+def test_forwarded_requests_are_timed_once(cluster):
+    client = cluster.app.test_client()
+    for _ in range(3):
+        assert client.post("/toggle_demo").status_code == 200
+    # Let the scanner republish its metrics file
+    time.sleep(cluster.METRICS_INTERVAL * 3)
+    text = client.get("/metrics").get_data(as_text=True)
+    assert route_count(text, "/toggle_demo", "POST", "200") == 3
+
+
+def test_exited_scanner_keeps_counts_but_not_gauges(cluster, tmp_path):
+    # Metrics file of a scanner that has since been restarted
+    dead = subprocess.Popen([sys.executable, "-c", ""])
+    dead.wait()
+    old = Registry()
+    old.counter("axiom_rugcheck_results_total", "Rug-check outcomes", ("result",)).inc(("passed",), 5)
+    old.gauge("axiom_threads", "Live Python threads", lambda: 99)
+    path = f"{cluster.METRICS_PREFIX}{dead.pid}"
+    with open(path, "w") as f:
+        json.dump({"process": f"scanner-{dead.pid}", "metrics": old.collect()}, f)
+    try:
+        time.sleep(cluster.METRICS_INTERVAL * 3)
+        text = cluster.app.test_client().get("/metrics").get_data(as_text=True)
+    finally:
+        os.unlink(path)
+    lines = text.splitlines()
+    live = cluster.scanner_process.pid
+    assert any(line.startswith(f'axiom_threads{{process="scanner-{live}"}}') for line in lines)
+    assert not any(f"scanner-{dead.pid}" in line for line in lines)
+    assert 'axiom_rugcheck_results_total{result="passed"} 5' in lines
+
+
+def test_roles_refuse_to_start_without_ipc_key():
+    env = {k: v for k, v in os.environ.items() if k != "AXIOM_IPC_KEY"}
+    for role in ("scanner", "web"):
+        proc = subprocess.run([sys.executable, "dashboard.py"], cwd=ROOT, env=dict(env, AXIOM_ROLE=role),
+                              capture_output=True, text=True, timeout=60)
+        assert proc.returncode != 0
+        assert "AXIOM_IPC_KEY must be set" in proc.stderr
+
+
+# ---- snapshot file ----
+def test_publisher_writes_owner_only_and_follower_loads_new_versions(tmp_path):
+    path = str(tmp_path / "snapshot.json")
+    state = {"n": 0}
+    loaded = []
+    publisher = SnapshotPublisher(path, lambda: dict(state), None, max_interval=60).start()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    follower = SnapshotFollower(path, loaded.append, interval=60)
+    assert follower.refresh() and loaded == [{"n": 0}]
+    # Same file version: nothing to load
+    assert not follower.refresh()
+    state["n"] = 1
+    publisher.publish()
+    assert follower.refresh() and loaded[-1] == {"n": 1}
+    assert follower.stats["loaded"] == 2
+    assert not os.path.exists(f"{path}.{os.getpid()}.tmp")
+
+
+def test_publisher_follows_the_event_store(tmp_path):
+    path = str(tmp_path / "snapshot.json")
+    store = EventStore()
+    store.channel("log")
+    SnapshotPublisher(path, lambda: {"seq": store.last_seq()}, store, debounce=0.01, max_interval=60).start()
+    loaded = []
+    SnapshotFollower(path, loaded.append, interval=0.02).start()
+    store.append("log", "hello")
+    assert wait_for(lambda: loaded and loaded[-1]["seq"] == 1, timeout=5)
+
+
+def test_follower_without_a_file():
+    follower = SnapshotFollower("/nonexistent/snapshot.json", lambda s: None)
+    assert not follower.refresh()
+
+
+# ---- control channel ----
+def test_control_round_trip_and_reconnect(tmp_path):
+    address = str(tmp_path / "control.sock")
+    key = secrets.token_bytes(16)
+
+    def handler(msg):
+        if msg == "boom":
+            raise ValueError("handler failed")
+        return {"echo": msg}
+
+    server = ControlServer(address, key, handler).start()
+    client = ControlClient(address, key)
+    assert client.request("ping") == {"echo": "ping"}
+    assert client.request("ping") == {"echo": "ping"}
+    assert len(client._idle) == 1
+    failed = client.request("boom")
+    assert failed["status"] == 500 and b"handler failed" in failed["body"]
+    # A restarted server: the pooled connection is stale and gets replaced
+    server.listener.close()
+    for conn in client._idle:
+        conn.close()
+    ControlServer(address, key, handler).start()
+    assert client.request("again") == {"echo": "again"}
+
+
+def test_control_rejects_the_wrong_key(tmp_path):
+    address = str(tmp_path / "control.sock")
+    ControlServer(address, secrets.token_bytes(16), lambda msg: msg).start()
+    with pytest.raises(AuthenticationError):
+        ControlClient(address, secrets.token_bytes(16)).request("hello")
+
+
+# ---- web worker against a scanner process ----
+def test_control_requests_are_forwarded_and_applied(cluster):
+    client = cluster.app.test_client()
+    demo = cluster.bot_status["demo"]
+    resp = client.post("/toggle_demo")
+    assert resp.get_json()["demo"] is (not demo)
+    # The worker refreshed its snapshot before answering
+    assert cluster.bot_status["demo"] is (not demo)
+
+
+def test_scanner_internals_are_forwarded(cluster):
+    client = cluster.app.test_client()
+    assert cluster.token_cache is None
+    stats = client.get("/cache_stats").get_json()
+    assert {"hits", "misses", "loads"} <= set(stats)
+    assert "jobs" in client.get("/scheduler_stats").get_json()
+
+
+def test_tokens_served_from_the_published_snapshot(cluster):
+    client = cluster.app.test_client()
+    assert wait_for(lambda: cluster.tokens_state["payload"] is not None)
+    assert client.get("/tokens").get_json() == cluster.tokens_state["payload"]
+    assert client.get("/series_stats").get_json()["tokens"] == 0
+    # Other windows come from the scanner's own series
+    forwarded = client.get("/tokens?window=600&points=10")
+    assert forwarded.status_code == 200 and forwarded.get_json() == []
+
+
+def test_conditional_get_passes_through(cluster):
+    client = cluster.app.test_client()
+    first = client.get("/tokens?window=600&points=10")
+    again = client.get("/tokens?window=600&points=10", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_health_and_snapshot_age(cluster):
+    client = cluster.app.test_client()
+    health = client.get("/health")
+    assert health.status_code == 200
+    body = health.get_json()
+    assert body["role"] == "web" and body["ok"] and body["snapshot_age"] < body["snapshot_stale_after"]
+    assert "axiom_snapshot_age_seconds{process=" in client.get("/metrics").get_data(as_text=True)
+
+
+def test_secrets_stay_out_of_the_snapshot(cluster):
+    with open(cluster.SNAPSHOT_FILE) as f:
+        snapshot = json.load(f)
+    assert set(snapshot["config"]) <= set(cluster.SHARED_CONFIG_KEYS)
+    assert stat.S_IMODE(os.stat(cluster.SNAPSHOT_FILE).st_mode) == 0o600
@@ -0,0 +1,130 @@
+import json
+
+
+def test_log_deltas_follow_the_cursor(dashboard, client):
+    first = client.get("/get_logs")
+    assert first.headers["X-Snapshot"] == "1"
+    seq = int(first.headers["X-Seq"])
+    dashboard.add_log("one")
+    dashboard.add_log("two")
+    delta = client.get(f"/get_logs?since={seq}")
+    assert "X-Snapshot" not in delta.headers
+    assert [line.split("] ", 1)[1] for line in delta.get_json()] == ["one", "two"]
+    assert int(delta.headers["X-Seq"]) == seq + 2
+    assert client.get(f"/get_logs?since={seq + 2}").get_json() == []
+
+
+def test_cursor_from_before_a_restart_gets_a_snapshot(dashboard, client):
+    dashboard.add_log("present")
+    resp = client.get(f"/get_logs?since={dashboard.events.last_seq() + 1000}")
+    assert resp.headers["X-Snapshot"] == "1"
+    assert resp.get_json()[-1].endswith("present")
+
+
+def test_unchanged_channel_answers_304(dashboard, client):
+    dashboard.add_log("trade feed unchanged")
+    resp = client.get("/get_trades?since=0")
+    etag = resp.headers["ETag"]
+    # A log event moves the store seq but not the trade channel
+    dashboard.add_log("only logs moved")
+    again = client.get("/get_trades?since=0", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    dashboard.record_trade("TOK", "Buy", 10.0, 1.0, "test")
+    assert client.get("/get_trades?since=0", headers={"If-None-Match": etag}).status_code == 200
+
+
+def read_events(resp, count):
+    # Parses `count` SSE events off a streaming test-client response
+    events, buf = [], ""
+    for chunk in resp.response:
+        buf += chunk.decode()
+        while "\n\n" in buf:
+            block, buf = buf.split("\n\n", 1)
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+            if "data" in fields:
+                events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+        if len(events) >= count:
+            return events
+    return events
+
+
+def test_stream_resumes_from_last_event_id(dashboard, client):
+    dashboard.add_log("before")
+    cursor = dashboard.events.last_seq()
+    dashboard.add_log("missed while disconnected")
+    dashboard.record_trade("TOK", "Sell", 20.0, -2.0, "test")
+    resp = client.get("/stream", headers={"Last-Event-ID": str(cursor)}, buffered=False)
+    try:
+        (seq1, ch1, item1), (seq2, ch2, item2) = read_events(resp, 2)
+    finally:
+        resp.close()
+    assert (seq1, ch1) == (cursor + 1, "log") and item1.endswith("missed while disconnected")
+    assert (seq2, ch2) == (cursor + 2, "trade") and item2["type"] == "Sell"
+
+
+def test_stream_slots_are_capped_and_released(dashboard, client):
+    assert dashboard.STREAM_LIMIT == 2
+    open_streams = [client.get("/stream", buffered=False) for _ in range(2)]
+    try:
+        assert [r.status_code for r in open_streams] == [200, 200]
+        refused = client.get("/stream", buffered=False)
+        assert refused.status_code == 503
+        refused.close()
+    finally:
+        open_streams.pop().close()
+    again = client.get("/stream", buffered=False)
+    assert again.status_code == 200
+    again.close()
+    open_streams.pop().close()
+
+
+def test_trade_history_pages(dashboard, client):
+    for i in range(7):
+        dashboard.ledger.record(1000.0 + i, "PAGED", "Buy", 10.0, 1.0, "demo", "test")
+    dashboard.ledger.flush()
+    first = client.get("/get_trades?token=PAGED&limit=4").get_json()
+    assert [t["ts"] for t in first["items"]] == [1006.0, 1005.0, 1004.0, 1003.0]
+    rest = client.get(f"/get_trades?token=PAGED&limit=4&cursor={first['next']}").get_json()
+    assert [t["ts"] for t in rest["items"]] == [1002.0, 1001.0, 1000.0]
+    assert rest["next"] is None
+    # limit is clamped, not rejected
+    assert len(client.get("/get_trades?token=PAGED&limit=0").get_json()["items"]) == 1
+
+
+def test_bad_cursor_is_a_400(client):
+    resp = client.get("/get_trades?cursor=not-a-cursor")
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "Invalid cursor"}
+
+
+def test_pnl_summary(dashboard, client):
+    for i in range(3):
+        dashboard.ledger.record(2000.0 + i, f"PNL{i}", "Sell", 100.0, 10.0 * (i + 1), "demo", "test")
+    dashboard.ledger.flush()
+    summary = client.get("/pnl_summary?top=1000").get_json()
+    assert summary["totals"]["trades"] >= 3
+    assert summary["ledger"]["inserted"] >= 3
+    best = summary["tokens"]["best"]
+    assert best[0]["token"] == "PNL2" and best[0]["profit"] == 30.0
+    assert len(client.get("/pnl_summary?top=-5").get_json()["tokens"]["best"]) == 1
+    (token,) = client.get("/pnl_summary?token=PNL1").get_json()["token"]
+    assert token["trades"] == 1 and token["sells"] == 1
+
+
+def route_count(text, route, method, status):
+    prefix = f'axiom_http_request_duration_seconds_count{{route="{route}",method="{method}",status="{status}"}} '
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix):])
+    return 0
+
+
+def test_route_latency_in_metrics(client):
+    before = route_count(client.get("/metrics").get_data(as_text=True), "/get_logs", "GET", "200")
+    for _ in range(3):
+        client.get("/get_logs")
+    client.get("/no_such_route")
+    text = client.get("/metrics").get_data(as_text=True)
+    assert route_count(text, "/get_logs", "GET", "200") == before + 3
+    assert route_count(text, "unmatched", "GET", "404") >= 1
+    assert "# TYPE axiom_http_request_duration_seconds histogram" in text
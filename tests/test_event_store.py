@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+
+from event_store import EventStore, Journal, RingBuffer
+
+
+def test_ring_buffer_cursor_after_wrap():
+    ring = RingBuffer(4)
+    for seq in range(1, 11):
+        ring.append(seq * 2, f"item{seq}")
+    assert len(ring) == 4
+    assert ring.last_seq() == 20
+    assert ring.after() == [(14, "item7"), (16, "item8"), (18, "item9"), (20, "item10")]
+    assert ring.after(16) == [(18, "item9"), (20, "item10")]
+    # Cursors between seqs and older than the ring still resume correctly
+    assert ring.after(17) == [(18, "item9"), (20, "item10")]
+    assert ring.after(3) == ring.after()
+    assert ring.after(20) == []
+
+
+def test_empty_ring():
+    ring = RingBuffer(3)
+    assert ring.last_seq() == 0
+    assert ring.after(5) == []
+
+
+def test_one_cursor_across_channels():
+    store = EventStore(capacity=10)
+    trades, logs = store.channel("trade"), store.channel("log")
+    trades.append({"id": 1})
+    logs.append("hello")
+    trades.append({"id": 2})
+    assert store.events_since(1, ["trade", "log"]) == [(2, "log", "hello"), (3, "trade", {"id": 2})]
+    assert store.items("trade", since=1) == ([{"id": 2}], 3)
+    assert list(logs) == ["hello"]
+
+
+def test_wait_for_wakes_on_append():
+    store = EventStore()
+    store.channel("trade")
+    store.channel("log")
+    got = []
+    waiter = threading.Thread(target=lambda: got.extend(store.wait_for(0, ["trade"], timeout=5)))
+    waiter.start()
+    time.sleep(0.05)
+    # Events on other channels don't end the wait
+    store.append("log", "ignored")
+    time.sleep(0.05)
+    assert waiter.is_alive()
+    store.append("trade", "t1")
+    waiter.join(5)
+    assert got == [(2, "trade", "t1")]
+    assert store.wait_for(2, ["trade"], timeout=0.05) == []
+
+
+def test_journal_replay(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    store = EventStore(capacity=3, journal=Journal(path, fsync="always"))
+    store.channel("trade")
+    store.channel("log")
+    for i in range(5):
+        store.append("trade", {"n": i})
+        store.append("log", f"log {i}")
+    store.close()
+
+    restored = EventStore(capacity=3, journal=Journal(path, fsync="always"))
+    restored.channel("trade")
+    restored.channel("log")
+    assert restored.replay() == 6
+    assert restored.last_seq() == 10
+    assert list(restored.channel("trade")) == [{"n": 2}, {"n": 3}, {"n": 4}]
+    # New events continue the sequence
+    assert restored.append("log", "after restart") == 11
+    restored.close()
+
+
+def test_journal_replay_skips_torn_tail(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    journal = Journal(path, fsync="always")
+    journal.append({"seq": 1, "ch": "trade", "ts": 0, "data": "ok"})
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(b'{"seq":2,"ch":"trade","da')
+    records = Journal(path, fsync="always").read_tail({"trade"}, 10)
+    assert [r["seq"] for r in records] == [1]
+
+
+def test_batch_journal_flushes(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    journal = Journal(path, fsync="batch", flush_interval=60, batch_size=1000)
+    journal.append({"seq": 1, "ch": "log", "ts": 0, "data": "x"})
+    assert os.path.getsize(path) == 0
+    journal.flush()
+    assert os.path.getsize(path) > 0
+    journal.close()
+
+
+def test_rotation_keeps_ring_and_archives(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    journal = Journal(path, fsync="always", max_bytes=2000, keep=2)
+    store = EventStore(capacity=5, journal=journal)
+    store.channel("trade")
+    for i in range(200):
+        store.append("trade", {"n": i, "pad": "x" * 20})
+    assert journal.stats["rotations"] > 1
+    assert os.path.exists(f"{path}.1") and os.path.exists(f"{path}.2")
+    assert not os.path.exists(f"{path}.3")
+    assert journal.size() <= 2000
+    with open(path, "rb") as f:
+        seqs = [json.loads(line)["seq"] for line in f]
+    assert seqs == sorted(seqs) and seqs[-1] == 200
+    store.close()
+
+    restored = EventStore(capacity=5, journal=Journal(path, fsync="always"))
+    restored.channel("trade")
+    restored.replay()
+    assert [t["n"] for t in restored.channel("trade")] == [195, 196, 197, 198, 199]
+    restored.close()
+
+
+def test_export_and_load_round_trip():
+    source = EventStore(capacity=4)
+    source.channel("trade")
+    source.channel("log")
+    for i in range(6):
+        source.append("trade" if i % 2 else "log", i)
+    epoch, seq, records = source.export()
+
+    copy = EventStore(capacity=4)
+    copy.channel("trade")
+    copy.channel("log")
+    copy.load(records, seq, epoch)
+    assert copy.epoch == epoch and copy.last_seq() == 6
+    assert copy.events_since(None, ["trade", "log"]) == source.events_since(None, ["trade", "log"])
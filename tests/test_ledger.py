@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from ledger import TradeLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.db"), flush_interval=0.01)
+    yield ledger
+    ledger.close()
+
+
+def fill(ledger, n, same_ts_every=3):
+    for i in range(n):
+        # Repeated timestamps make the id tiebreak matter
+        ts = 1000.0 + i // same_ts_every
+        ledger.record(ts, f"TOK{i % 4}", "Buy" if i % 2 else "Sell", 100.0, 5.0 if i % 3 else -5.0, "demo", "bot")
+    ledger.flush()
+
+
+def test_keyset_pages_cover_everything_once(ledger):
+    fill(ledger, 103)
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = ledger.query(cursor=cursor, limit=10)
+        seen.extend(rows)
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == 11
+    assert len(seen) == 103
+    assert len({r["id"] for r in seen}) == 103
+    keys = [(r["ts"], r["id"]) for r in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filtered_pages(ledger):
+    fill(ledger, 60)
+    rows, cursor = ledger.query(token="TOK1", action="Buy", limit=5)
+    assert len(rows) == 5 and cursor
+    rest, _ = ledger.query(token="TOK1", action="Buy", cursor=cursor, limit=100)
+    everything = rows + rest
+    assert all(r["token"] == "TOK1" and r["action"] == "Buy" for r in everything)
+    assert len(everything) == 15
+
+    in_range, _ = ledger.query(start=1005.0, end=1007.0, limit=100)
+    assert {r["ts"] for r in in_range} == {1005.0, 1006.0}
+
+
+def test_exact_page_boundary_ends(ledger):
+    fill(ledger, 20)
+    rows, cursor = ledger.query(limit=20)
+    assert len(rows) == 20
+    assert ledger.query(cursor=cursor, limit=20) == ([], None)
+
+
+def test_aggregates_follow_inserts(ledger):
+    fill(ledger, 12)
+    totals = ledger.totals()
+    assert totals["trades"] == 12
+    assert totals["volume"] == pytest.approx(1200.0)
+    assert totals["profit"] == pytest.approx(sum(5.0 if i % 3 else -5.0 for i in range(12)))
+    (tok0,) = ledger.token_pnl("TOK0")
+    assert tok0["trades"] == 3
+    summary = ledger.token_pnl(top=2)
+    assert len(summary["best"]) == 2 and len(summary["worst"]) == 2
+    assert ledger.wallet_pnl()[0]["wallet"] == "demo"
+
+
+def test_reader_without_writer_is_read_only(ledger):
+    fill(ledger, 5)
+    reader = TradeLedger(ledger.path, writer=False)
+    rows, _ = reader.query(limit=10)
+    assert len(rows) == 5
+    with pytest.raises(RuntimeError):
+        reader.record(1.0, "TOK", "Buy", 1.0, 1.0, "demo")
+    with pytest.raises(sqlite3.OperationalError):
+        reader._reader().execute("DELETE FROM trades")
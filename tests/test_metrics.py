@@ -0,0 +1,50 @@
+import json
+import threading
+
+from metrics import Registry, merge, render
+
+
+def test_shards_of_exited_threads_are_retired():
+    registry = Registry()
+    hits = registry.counter("hits_total", "Hits", ("route",))
+    for _ in range(50):
+        t = threading.Thread(target=hits.inc, args=(("/",),))
+        t.start()
+        t.join()
+    assert len(hits._shards) <= 1
+    assert 'hits_total{route="/"} 50' in registry.render()
+
+
+def test_histogram_render():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        latency.observe(v)
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_collect_error_is_reported():
+    registry = Registry()
+    registry.gauge("broken", "Broken gauge", lambda: 1 / 0)
+    assert "# error collecting broken" in registry.render()
+
+
+def test_merge_sums_counters_and_labels_gauges():
+    def process(n, depth):
+        registry = Registry()
+        registry.counter("req_total", "Requests", ("route",)).inc(("/",), n)
+        registry.histogram("lat_seconds", "Latency", buckets=(1.0,)).observe(0.5)
+        registry.gauge("depth", "Queue depth", lambda: depth)
+        # Published through JSON, like the per-process metrics files
+        return json.loads(json.dumps(registry.collect()))
+
+    text = render(merge({"scanner": process(3, 7), "web-1": process(4, 0)}))
+    lines = text.splitlines()
+    assert 'req_total{route="/"} 7' in lines
+    assert "lat_seconds_count 2" in lines
+    assert 'depth{process="scanner"} 7' in lines
+    assert 'depth{process="web-1"} 0' in lines
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from rpc_client import RpcClient, RpcError
+from stubs import StubConfig, rpc_stub
+
+
+def test_concurrent_calls_share_batches(rpc_server):
+    client = RpcClient([rpc_server.url], batch_window=0.02, max_batch=50)
+    owners = [f"Owner{i}" for i in range(40)]
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        balances = list(pool.map(client.get_balance, owners))
+    assert all(isinstance(b, int) for b in balances)
+    stats = client.snapshot()
+    assert stats["batched_calls"] == 40
+    assert stats["http_requests"] < 10
+    assert rpc_server.requests == stats["http_requests"]
+
+
+def test_identical_calls_coalesce_and_cache(rpc_server):
+    client = RpcClient([rpc_server.url], batch_window=0.02)
+    futures = [client.call_async("getTokenSupply", ["Mint1"]) for _ in range(5)]
+    assert len({id(f) for f in futures}) == 1
+    futures[0].result(5)
+    client.call("getTokenSupply", ["Mint1"])
+    stats = client.snapshot()
+    assert stats["coalesced"] == 4
+    assert stats["cache_hits"] == 1
+    assert stats["batched_calls"] == 1
+
+
+def test_failover_to_healthy_endpoint(rpc_server):
+    broken = rpc_stub(StubConfig(error_rate=1.0)).start()
+    try:
+        # The broken endpoint is tried first, so the batch has to fail over
+        client = RpcClient([broken.url, rpc_server.url], batch_window=0.001)
+        assert isinstance(client.get_slot(), int)
+        stats = client.snapshot()
+        assert stats["failovers"] == 1
+        bad, good = stats["endpoints"]
+        assert bad["errors"] == 1 and bad["cooling_for"] > 0
+        assert good["requests"] == 1 and good["errors"] == 0
+        # While cooling down the broken endpoint goes to the back of the line
+        client.invalidate()
+        client.get_slot()
+        assert client.snapshot()["failovers"] == 1
+    finally:
+        broken.stop()
+
+
+def test_all_endpoints_failing_raises():
+    broken = rpc_stub(StubConfig(error_rate=1.0)).start()
+    try:
+        client = RpcClient([broken.url], batch_window=0.001)
+        with pytest.raises(RpcError):
+            client.get_slot()
+        assert client.snapshot()["errors"] == 1
+    finally:
+        broken.stop()
+
+
+def test_no_endpoints():
+    with pytest.raises(RpcError):
+        RpcClient([]).get_slot()
+
+
+def test_top_holder_percents(rpc_server):
+    client = RpcClient([rpc_server.url], batch_window=0.01)
+    percents = client.top_holder_percents([f"Mint{i}" for i in range(10)])
+    assert len(percents) == 10
+    assert all(0 < p <= 100 for p in percents.values())
+    # Largest-account and supply lookups for every mint went out together
+    assert client.snapshot()["http_requests"] <= 2
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+import requests
+
+from scanner import WatchlistScanner
+from scheduler import RateLimited
+from token_cache import TTLCache
+
+
+@pytest.fixture
+def fetch_batch(dex):
+    calls = []
+
+    def fetch(addresses):
+        calls.append(list(addresses))
+        r = requests.get(f"{dex.url}/latest/dex/tokens/{','.join(addresses)}", timeout=5)
+        r.raise_for_status()
+        return {p["baseToken"]["address"]: float(p["priceUsd"]) for p in r.json()["pairs"]}
+
+    fetch.calls = calls
+    return fetch
+
+
+def tokens(n):
+    return [f"Tok{i:04d}" for i in range(n)]
+
+
+def test_sweep_batches_every_token(fetch_batch):
+    scanner = WatchlistScanner(fetch_batch, batch_size=30, max_workers=4)
+    results = dict(pair for batch in scanner.sweep(tokens(100) + ["Tok0001"]) for pair in batch)
+    assert len(results) == 100 and all(results.values())
+    assert sorted(len(c) for c in fetch_batch.calls) == [10, 30, 30, 30]
+    stats = scanner.snapshot()
+    assert stats["batches"] == 4 and stats["tokens_scanned"] == 100
+
+
+def test_second_sweep_served_from_cache(fetch_batch):
+    cache = TTLCache(ttl=60)
+    scanner = WatchlistScanner(fetch_batch, cache=cache, batch_size=30)
+    first = dict(pair for batch in scanner.sweep(tokens(60)) for pair in batch)
+    second = dict(pair for batch in scanner.sweep(tokens(60)) for pair in batch)
+    assert first == second
+    assert len(fetch_batch.calls) == 2
+    assert scanner.snapshot()["cache_served"] == 60
+    assert cache.snapshot()["batch_saved"] == 58
+
+
+def test_concurrent_sweeps_fetch_once():
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(addresses):
+        calls.append(list(addresses))
+        release.wait(5)
+        return {a: 1.0 for a in addresses}
+
+    cache = TTLCache(ttl=60)
+    scanner = WatchlistScanner(slow_fetch, cache=cache, batch_size=30)
+    out = {}
+    threads = [threading.Thread(target=lambda i=i: out.__setitem__(i, [p for b in scanner.sweep(tokens(10)) for p in b]))
+               for i in range(2)]
+    for t in threads:
+        t.start()
+    threading.Timer(0.1, release.set).start()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert dict(out[0]) == dict(out[1]) == {t: 1.0 for t in tokens(10)}
+    assert scanner.snapshot()["coalesced"] == 10
+
+
+def test_rate_limit_leaves_cache_untouched():
+    def limited(addresses):
+        raise RateLimited("dexscreener", 5)
+
+    cache = TTLCache()
+    scanner = WatchlistScanner(limited, cache=cache)
+    with pytest.raises(RateLimited):
+        for _ in scanner.sweep(tokens(5)):
+            pass
+    assert cache.snapshot()["size"] == 0
+    assert cache.snapshot()["inflight"] == 0
+    assert scanner.snapshot()["rate_limited"] == 1
+
+
+def test_failed_batch_yields_none():
+    def broken(addresses):
+        raise ValueError("boom")
+
+    scanner = WatchlistScanner(broken)
+    results = [pair for batch in scanner.sweep(tokens(3)) for pair in batch]
+    assert results == [(t, None) for t in tokens(3)]
+    assert scanner.snapshot()["batch_errors"] == 1
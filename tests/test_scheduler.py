@@ -0,0 +1,104 @@
+import threading
+import time
+
+from scheduler import RateLimited, Scheduler, TokenBucket, backoff_delay
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_start_job_is_idempotent():
+    scheduler = Scheduler(workers=4)
+    running, peak, runs = [0], [0], [0]
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            running[0] += 1
+            runs[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return 0.01
+
+    scheduler.register("scan", job, interval=0.01)
+    scheduler.start()
+    for _ in range(20):
+        scheduler.start_job("scan")
+        scheduler.start()
+    assert wait_until(lambda: runs[0] >= 5)
+    assert peak[0] == 1
+    snap = scheduler.snapshot()
+    assert snap["delayed"] + snap["queue_depth"] + snap["busy_workers"] == 1
+
+
+def test_stop_and_restart():
+    scheduler = Scheduler(workers=2)
+    runs = []
+    scheduler.register("scan", lambda: runs.append(1), interval=0.01)
+    scheduler.start()
+    scheduler.start_job("scan")
+    assert wait_until(lambda: len(runs) >= 2)
+    scheduler.stop_job("scan")
+    assert wait_until(lambda: not scheduler.snapshot()["jobs"]["scan"]["scheduled"])
+    stopped_at = len(runs)
+    time.sleep(0.05)
+    assert len(runs) == stopped_at
+    scheduler.start_job("scan")
+    scheduler.start_job("scan")
+    assert wait_until(lambda: len(runs) > stopped_at)
+
+
+def test_priority_order():
+    scheduler = Scheduler(workers=1)
+    order = []
+    gate = threading.Event()
+    scheduler.register("block", lambda: gate.wait(5) and None, interval=60)
+    scheduler.register("low", lambda: order.append("low"), interval=60, priority=10)
+    scheduler.register("high", lambda: order.append("high"), interval=60, priority=0)
+    scheduler.start()
+    scheduler.start_job("block")
+    assert wait_until(lambda: scheduler.snapshot()["busy_workers"] == 1)
+    scheduler.start_job("low")
+    scheduler.start_job("high")
+    assert wait_until(lambda: scheduler.snapshot()["queue_depth"] == 2)
+    gate.set()
+    assert wait_until(lambda: len(order) == 2)
+    assert order == ["high", "low"]
+
+
+def test_rate_limited_job_backs_off():
+    scheduler = Scheduler(workers=1)
+
+    def limited():
+        raise RateLimited("dexscreener", retry_after=30)
+
+    scheduler.register("scan", limited, interval=0.01)
+    scheduler.start()
+    scheduler.start_job("scan")
+    assert wait_until(lambda: scheduler.snapshot()["jobs"]["scan"]["rate_limited"] == 1)
+    time.sleep(0.05)
+    job = scheduler.snapshot()["jobs"]["scan"]
+    assert job["runs"] == 1
+    assert job["next_run_in"] > 25
+
+
+def test_backoff_delay_is_capped():
+    assert backoff_delay(1, base=1, cap=60) <= 1
+    assert all(backoff_delay(n, base=1, cap=60) <= 60 for n in range(1, 30))
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.acquire(timeout=1)
+    bucket.pause(10)
+    assert not bucket.acquire(timeout=0.05)
+    assert bucket.snapshot()["pauses"] == 1
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from timeseries import TimeSeriesStore
+
+
+def sample(token, price, liquidity=1000.0, name=None):
+    return token, price, liquidity, price * 1e6, 5e4, name
+
+
+def test_latest_and_names():
+    store = TimeSeriesStore(min_interval=1)
+    store.record_many([sample("A", 1.0, name="Alpha"), sample("B", 2.0)], ts=100)
+    store.record_many([sample("A", 1.5), sample("B", 2.5)], ts=110)
+    latest = store.latest(["A", "B", "missing"])
+    assert set(latest) == {"A", "B"}
+    assert latest["A"]["price"] == 1.5 and latest["A"]["ts"] == 110
+    assert latest["A"]["name"] == "Alpha"
+
+
+def test_close_samples_overwrite_latest_slot():
+    store = TimeSeriesStore(min_interval=5)
+    store.record("A", 1.0, 1, 1, 1, ts=100)
+    store.record("A", 2.0, 1, 1, 1, ts=102)
+    store.record("A", 3.0, 1, 1, 1, ts=110)
+    assert store.stats["overwrites"] == 1
+    assert store.indicators(["A"], window=60, now=110)["A"]["samples"] == 2
+
+
+def test_ring_keeps_capacity_samples():
+    store = TimeSeriesStore(capacity=5, min_interval=1)
+    for i in range(12):
+        store.record("A", float(i + 1), 1, 1, 1, ts=i * 10)
+    ind = store.indicators(["A"], window=1000, now=110)["A"]
+    assert ind["samples"] == 5
+    assert ind["change"] == pytest.approx((12 / 8 - 1) * 100, rel=1e-4)
+
+
+def test_grows_then_evicts_least_recent():
+    store = TimeSeriesStore(max_tokens=4, initial_rows=1, min_interval=1)
+    for i, token in enumerate("ABCD"):
+        store.record(token, 1.0, 1, 1, 1, ts=i)
+    assert store.memory()["rows_allocated"] == 4
+    store.record("A", 1.0, 1, 1, 1, ts=10)
+    store.record("E", 1.0, 1, 1, 1, ts=11)
+    assert set(store.latest()) == {"A", "C", "D", "E"}
+    assert store.stats["evictions"] == 1
+
+
+def test_one_batch_never_recycles_a_row_twice():
+    store = TimeSeriesStore(max_tokens=4, initial_rows=4, min_interval=1)
+    store.record_many([sample(t, 1.0) for t in "ABCD"], ts=0)
+    # Known tokens keep their rows; new ones take distinct rows, and what
+    # doesn't fit is dropped
+    store.record_many([sample(t, 2.0) for t in "XYZ"] + [sample("A", 3.0)], ts=10)
+    latest = store.latest()
+    assert set(latest) == {"A", "X", "Y", "Z"}
+    assert latest["A"]["price"] == 3.0
+    store.record_many([sample(f"N{i}", 4.0) for i in range(6)], ts=20)
+    assert set(store.latest()) == {"N0", "N1", "N2", "N3"}
+    assert store.stats["samples"] == 12
+
+
+def test_trend_indicators():
+    store = TimeSeriesStore(min_interval=1)
+    for i, (price, liq) in enumerate([(1.0, 1000), (1.2, 1500), (1.1, 900), (1.3, 1200)]):
+        store.record("A", price, liq, 1, 1, ts=i * 60)
+    store.record("lonely", 1.0, 1, 1, 1, ts=180)
+    ind = store.indicators(["A", "lonely"], window=600, now=180)
+    a = ind["A"]
+    assert a["samples"] == 4
+    assert a["change"] == pytest.approx(30, rel=1e-4)
+    assert a["liquidity_change"] == pytest.approx(20, rel=1e-4)
+    assert a["liquidity_drawdown"] == pytest.approx(-20, rel=1e-4)
+    assert a["volatility"] > 0
+    assert ind["lonely"]["change"] is None and ind["lonely"]["volatility"] is None
+
+
+def test_volatility_independent_of_sampling_rate():
+    rng = np.random.default_rng(3)
+    estimates = []
+    for step in (10, 60):
+        store = TimeSeriesStore(capacity=400, min_interval=1)
+        price = 1.0
+        for i in range(3600 // step):
+            # 1% per sqrt(minute) either way
+            price *= np.exp(rng.normal(0, 0.01 * np.sqrt(step / 60)))
+            store.record("A", price, 1, 1, 1, ts=i * step)
+        estimates.append(store.indicators(["A"], window=3600, now=3600)["A"]["volatility"])
+    assert estimates == [pytest.approx(1.0, rel=0.2)] * 2
+
+
+def test_downsample_buckets():
+    store = TimeSeriesStore(min_interval=1)
+    for ts, price in [(0, 1.0), (10, 3.0), (70, 5.0)]:
+        store.record("A", price, 10.0, 1, 1, ts=ts)
+    start, step, series = store.downsample(["A"], window=120, points=2, now=120)
+    assert (start, step) == (0, 60)
+    assert series["A"]["price"] == [2.0, 5.0]
+    start, step, series = store.downsample(["A"], window=180, points=3, now=180)
+    assert series["A"]["price"] == [2.0, 5.0, None]
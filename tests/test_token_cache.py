@@ -0,0 +1,115 @@
+import threading
+import time
+
+from token_cache import TTLCache
+
+
+def test_concurrent_plans_fetch_once():
+    cache = TTLCache()
+    plans = []
+    start = threading.Barrier(8)
+
+    def planner():
+        start.wait()
+        plans.append(cache.plan(["abc"]))
+
+    threads = [threading.Thread(target=planner) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    leaders = [p for p in plans if p[1] == ["abc"]]
+    followers = [flight for p in plans for _, flight in p[3]]
+    assert len(leaders) == 1 and len(followers) == 7
+    cache.complete([("abc", "ABC")])
+    assert all(f.done.is_set() and f.value == "ABC" for f in followers)
+    stats = cache.snapshot()
+    assert stats["coalesced"] == 7
+    assert stats["loads"] == 1
+
+
+def test_stale_value_served_and_refreshed_once():
+    cache = TTLCache(ttl=0.05, stale_ttl=5)
+    cache.put("k", 1)
+    time.sleep(0.1)
+    served, fetch, refresh, _ = cache.plan(["k"])
+    assert served == [("k", 1)] and fetch == [] and refresh == ["k"]
+    # A second lookup during the reload is served without another refresh
+    assert cache.plan(["k"])[:3] == ([("k", 1)], [], [])
+    cache.complete([("k", 2)])
+    assert cache.plan(["k"])[0] == [("k", 2)]
+    assert cache.snapshot()["stale"] == 2
+
+
+def test_failures_are_cached_for_error_ttl():
+    cache = TTLCache(error_ttl=5)
+    _, fetch, _, _ = cache.plan(["dead"])
+    cache.complete([("dead", None)])
+    served, fetch, _, _ = cache.plan(["dead"])
+    assert served == [("dead", None)] and fetch == []
+    assert cache.snapshot()["errors"] == 1
+
+
+def test_failed_refresh_keeps_last_good_value():
+    cache = TTLCache(ttl=0.05, stale_ttl=5, error_ttl=5)
+    cache.put("k", 1)
+    time.sleep(0.1)
+    cache.plan(["k"])
+    cache.complete([("k", None)])
+    assert cache.plan(["k"])[0] == [("k", 1)]
+
+
+def test_plan_splits_keys():
+    cache = TTLCache(ttl=0.05, stale_ttl=5)
+    cache.put("fresh", 1)
+    cache.put("stale", 2)
+    time.sleep(0.1)
+    cache.put("fresh", 1)
+    served, fetch, refresh, waiting = cache.plan(["fresh", "stale", "new"])
+    assert dict(served) == {"fresh": 1, "stale": 2}
+    assert fetch == ["new"]
+    assert refresh == ["stale"]
+    assert waiting == []
+
+    # A second planner waits on the first one's load instead of fetching
+    served2, fetch2, refresh2, waiting2 = cache.plan(["new"])
+    assert (served2, fetch2, refresh2) == ([], [], [])
+    (key, flight), = waiting2
+    cache.complete([("new", 3), ("stale", 4)])
+    assert flight.done.is_set() and flight.value == 3
+    assert dict(cache.plan(["new", "stale"])[0]) == {"new": 3, "stale": 4}
+
+
+def test_abandon_releases_waiters():
+    cache = TTLCache()
+    _, fetch, _, _ = cache.plan(["k"])
+    _, _, _, waiting = cache.plan(["k"])
+    cache.abandon(fetch)
+    assert waiting[0][1].done.is_set()
+    assert waiting[0][1].value is None
+    # Nothing was stored, so the next plan fetches again
+    assert cache.plan(["k"])[1] == ["k"]
+
+
+def test_savings_counters():
+    cache = TTLCache()
+    _, fetch, _, _ = cache.plan([f"k{i}" for i in range(60)])
+    for i in range(0, 60, 30):
+        cache.note_upstream_call()
+        cache.complete([(k, 1) for k in fetch[i:i + 30]])
+    cache.plan([f"k{i}" for i in range(60)])
+    stats = cache.snapshot()
+    assert stats["batch_saved"] == 58
+    assert stats["upstream_saved"] == 60
+
+
+def test_lru_eviction():
+    cache = TTLCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.plan(["a"])
+    cache.put("c", 3)
+    served, fetch, _, _ = cache.plan(["a", "b", "c"])
+    assert dict(served) == {"a": 1, "c": 3}
+    assert fetch == ["b"]
+    assert cache.snapshot()["evictions"] == 1
@@ -0,0 +1,239 @@
+import threading
+import time
+
+import numpy as np
+
+# -------------------------------
+# Rolling token time series
+# -------------------------------
+# One row per token in preallocated NumPy arrays; each row is a ring of
+# `capacity` samples, so memory per token is fixed no matter how long the
+# bot runs. Rows are allocated in doubling chunks up to max_tokens, and the
+# least recently updated token is evicted after that. Indicators and
+# downsampling work on many rows at once.
+
+FIELDS = ("price", "liquidity", "marketcap", "volume")
+PRICE, LIQUIDITY, MARKETCAP, VOLUME = range(len(FIELDS))
+
+
+class TimeSeriesStore:
+    def __init__(self, capacity=360, max_tokens=4096, min_interval=5.0, initial_rows=64):
+        self.capacity = capacity
+        self.max_tokens = max_tokens
+        # Samples closer together than this overwrite the latest slot, so
+        # cache refreshes and retries don't crowd out the window
+        self.min_interval = min_interval
+        self._index = {}
+        self._tokens = []
+        self._names = []
+        self._lock = threading.Lock()
+        self._alloc(min(initial_rows, max_tokens))
+        self.stats = {"samples": 0, "overwrites": 0, "evictions": 0}
+
+    def _alloc(self, rows):
+        old = getattr(self, "_ts", None)
+        ts = np.full((rows, self.capacity), np.nan)
+        values = np.full((len(FIELDS), rows, self.capacity), np.nan, dtype=np.float32)
+        head = np.zeros(rows, dtype=np.int32)
+        count = np.zeros(rows, dtype=np.int32)
+        if old is not None:
+            n = old.shape[0]
+            ts[:n], values[:, :n], head[:n], count[:n] = old, self._values, self._head, self._count
+        self._ts, self._values, self._head, self._count = ts, values, head, count
+
+    def _row(self, token, taken=()):
+        # `taken`: rows already written by the current batch, never recycled.
+        # Returns None when every row is taken.
+        row = self._index.get(token)
+        if row is not None:
+            return row
+        if len(self._tokens) < self._ts.shape[0]:
+            row = len(self._tokens)
+            self._tokens.append(token)
+            self._names.append(None)
+        elif self._ts.shape[0] < self.max_tokens:
+            self._alloc(min(self._ts.shape[0] * 2, self.max_tokens))
+            return self._row(token, taken)
+        else:
+            # Full: recycle the row that was updated longest ago
+            last = self._last_ts()
+            last[list(taken)] = np.inf
+            row = int(np.argmin(last))
+            if row in taken:
+                return None
+            del self._index[self._tokens[row]]
+            self._tokens[row] = token
+            self._names[row] = None
+            self._ts[row] = np.nan
+            self._values[:, row] = np.nan
+            self._head[row] = self._count[row] = 0
+            self.stats["evictions"] += 1
+        self._index[token] = row
+        return row
+
+    def _last_ts(self):
+        n = len(self._tokens)
+        last = self._ts[np.arange(n), (self._head[:n] - 1) % self.capacity]
+        return np.where(self._count[:n] > 0, last, -np.inf)
+
+    # ---- writes ----
+    def record(self, token, price, liquidity, marketcap, volume, name=None, ts=None):
+        self.record_many([(token, price, liquidity, marketcap, volume, name)], ts)
+
+    def record_many(self, samples, ts=None):
+        # samples: (token, price, liquidity, marketcap, volume, name); tokens unique
+        if not samples:
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            # Known tokens claim their rows first so a new token in the same
+            # batch can't evict them; samples beyond max_tokens are dropped
+            rows = [self._index.get(s[0]) for s in samples]
+            taken = {row for row in rows if row is not None}
+            for i, s in enumerate(samples):
+                if rows[i] is None:
+                    rows[i] = self._row(s[0], taken)
+                    if rows[i] is not None:
+                        taken.add(rows[i])
+            samples = [s for row, s in zip(rows, samples) if row is not None]
+            if not samples:
+                return
+            rows = np.array([row for row in rows if row is not None], dtype=np.intp)
+            for row, s in zip(rows, samples):
+                if s[5]:
+                    self._names[row] = s[5]
+            cap = self.capacity
+            head, count = self._head[rows], self._count[rows]
+            last = self._ts[rows, (head - 1) % cap]
+            overwrite = (count > 0) & (ts - last < self.min_interval)
+            slot = np.where(overwrite, (head - 1) % cap, head)
+            self._ts[rows, slot] = ts
+            self._values[:, rows, slot] = np.array([s[1:5] for s in samples], dtype=np.float32).T
+            advance = ~overwrite
+            self._head[rows] = np.where(advance, (head + 1) % cap, head)
+            self._count[rows] = np.minimum(count + advance, cap)
+            self.stats["samples"] += len(samples)
+            self.stats["overwrites"] += int(overwrite.sum())
+
+    # ---- reads ----
+    def _recent(self, rows, since):
+        # Gathers the newest k samples of each row oldest-first, k being the
+        # most any row has at or after `since`; the newest sample ends up in
+        # the last column. Returns ts (n, k) and values (fields, n, k).
+        k = max(1, int((self._ts[rows] >= since).sum(axis=1).max(initial=0)))
+        cols = (self._head[rows, None] - k + np.arange(k)) % self.capacity
+        flat = rows[:, None] * self.capacity + cols
+        return self._ts.reshape(-1)[flat], self._values.reshape(len(FIELDS), -1)[:, flat]
+
+    def _rows(self, tokens):
+        if tokens is None:
+            return list(self._tokens), np.arange(len(self._tokens))
+        known = [t for t in tokens if t in self._index]
+        return known, np.array([self._index[t] for t in known], dtype=np.intp)
+
+    def latest(self, tokens=None):
+        # {token: {"name", "price", "liquidity", "marketcap", "volume", "ts"}}
+        with self._lock:
+            _, rows = self._rows(tokens)
+            rows = rows[self._count[rows] > 0]
+            names = [self._tokens[r] for r in rows]
+            slot = (self._head[rows] - 1) % self.capacity
+            ts = self._ts[rows, slot]
+            values = self._values[:, rows, slot]
+            labels = [self._names[r] for r in rows]
+        values = _listify(values)
+        ts = ts.tolist()
+        return {token: dict({field: values[f][i] for f, field in enumerate(FIELDS)}, name=labels[i], ts=ts[i])
+                for i, token in enumerate(names)}
+
+    def indicators(self, tokens=None, window=600.0, now=None):
+        # Over the samples in the last `window` seconds, per token:
+        #   change           - price return, first to last sample (%)
+        #   volatility       - realized volatility of log returns, % per
+        #                      sqrt(minute), so it doesn't depend on how
+        #                      often the token was sampled
+        #   liquidity_change - last liquidity vs the first sample (%)
+        #   liquidity_drawdown - last liquidity vs the window's peak (%, <= 0)
+        # Tokens with fewer than two samples in the window get None.
+        now = time.time() if now is None else now
+        with self._lock:
+            names, rows = self._rows(tokens)
+            if not names:
+                return {}
+            ts, values = self._recent(rows, now - window)
+        inside = ts >= now - window
+        n_inside = inside.sum(axis=1)
+        idx = np.arange(len(rows))
+        first = np.argmax(inside, axis=1)
+        # Samples inside the window are a suffix of each row
+        price = np.where(inside, values[PRICE], np.nan)
+        liquidity = np.where(inside, values[LIQUIDITY], np.nan)
+        last_liq = liquidity[:, -1]
+        peak = np.where(np.isnan(liquidity), -np.inf, liquidity).max(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (price[:, -1] / price[idx, first] - 1) * 100
+            liq_change = (last_liq / liquidity[idx, first] - 1) * 100
+            drawdown = (last_liq / np.where(peak > 0, peak, np.nan) - 1) * 100
+            log_returns = np.diff(np.log(price), axis=1)
+            minutes = np.diff(ts, axis=1) / 60
+            valid = ~np.isnan(log_returns) & (minutes > 0)
+            squared = np.where(valid, log_returns, 0) ** 2
+            volatility = np.sqrt(squared.sum(axis=1) / np.where(valid, minutes, 0).sum(axis=1)) * 100
+        enough = n_inside >= 2
+        columns = {"change": change, "volatility": volatility,
+                   "liquidity_change": liq_change, "liquidity_drawdown": drawdown}
+        columns = {key: _listify(np.where(enough, col, np.nan)) for key, col in columns.items()}
+        samples = n_inside.tolist()
+        return {token: dict({key: col[i] for key, col in columns.items()}, samples=samples[i])
+                for i, token in enumerate(names)}
+
+    def downsample(self, tokens=None, window=3600.0, points=60, fields=("price", "liquidity"), now=None):
+        # Bucket means over the last `window` seconds on a grid shared by all
+        # tokens; empty buckets are None. Returns (start, step, {token: {field: [...]}}).
+        now = time.time() if now is None else now
+        start, step = now - window, window / points
+        with self._lock:
+            names, rows = self._rows(tokens)
+            if not names:
+                return start, step, {}
+            ts, values = self._recent(rows, start)
+        bucket = np.floor((ts - start) / step)
+        inside = (bucket >= 0) & (bucket < points)
+        flat = (np.arange(len(rows))[:, None] * points + np.where(inside, bucket, 0)).astype(np.intp)[inside]
+        counts = np.bincount(flat, minlength=len(rows) * points).reshape(len(rows), points)
+        series = {}
+        for field in fields:
+            sums = np.bincount(flat, weights=values[FIELDS.index(field)][inside], minlength=len(rows) * points)
+            with np.errstate(invalid="ignore"):
+                series[field] = _listify(sums.reshape(len(rows), points) / counts)
+        return start, step, {token: {field: series[field][i] for field in fields}
+                             for i, token in enumerate(names)}
+
+    # ---- accounting ----
+    def __len__(self):
+        return len(self._tokens)
+
+    def memory(self):
+        with self._lock:
+            rows = self._ts.shape[0]
+            array_bytes = self._ts.nbytes + self._values.nbytes + self._head.nbytes + self._count.nbytes
+            tokens = len(self._tokens)
+        per_row = array_bytes // rows if rows else 0
+        return {"tokens": tokens, "rows_allocated": rows, "max_tokens": self.max_tokens,
+                "capacity": self.capacity, "bytes": array_bytes, "bytes_per_token": per_row,
+                "max_bytes": per_row * self.max_tokens}
+
+    def snapshot(self):
+        return dict(self.stats, **self.memory())
+
+
+def _listify(arr, digits=6):
+    # Nested lists for JSON, rounded to `digits` significant digits (samples
+    # are float32), with None where the value isn't finite
+    arr = np.asarray(arr, dtype=np.float64)
+    finite = np.isfinite(arr) & (arr != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = 10.0 ** (digits - 1 - np.floor(np.log10(np.abs(np.where(finite, arr, 1)))))
+    out = (np.round(arr * scale) / scale).astype(object)
+    out[~np.isfinite(arr)] = None
+    return out.tolist()
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------------
+# TTL cache with single-flight and stale-while-revalidate
+# -------------------------------
+# Callers fetch many keys per upstream call: plan() splits a lookup into
+# served, to-fetch, to-refresh and already-in-flight keys, and complete()
+# stores what was loaded. A loaded value of None counts as a failure and is
+# cached for error_ttl so a dead token doesn't get refetched on every check.
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "error")
+
+    def __init__(self, value, fresh_until, stale_until, error):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.error = error
+
+
+class _Flight:
+    __slots__ = ("done", "value")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class TTLCache:
+    def __init__(self, ttl=15.0, stale_ttl=45.0, error_ttl=5.0, max_entries=1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "errors": 0,
+                      "evictions": 0, "coalesced": 0, "loads": 0, "upstream_calls": 0}
+
+    def plan(self, keys):
+        # Returns (served, fetch, refresh, waiting):
+        #   served  - [(key, value)] for fresh entries and stale ones
+        #   fetch   - keys with nothing usable; the caller now loads them
+        #   refresh - stale keys (already served) the caller should reload
+        #   waiting - [(key, flight)] being loaded by someone else
+        # Every key in fetch and refresh must go to complete() or abandon().
+        now = time.monotonic()
+        served, fetch, refresh, waiting = [], [], [], []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now < entry.fresh_until:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    served.append((key, entry.value))
+                    continue
+                if entry is not None and not entry.error and now < entry.stale_until:
+                    self._entries.move_to_end(key)
+                    self.stats["stale"] += 1
+                    served.append((key, entry.value))
+                    if key not in self._inflight:
+                        self._inflight[key] = _Flight()
+                        refresh.append(key)
+                    continue
+                self.stats["misses"] += 1
+                flight = self._inflight.get(key)
+                if flight is not None:
+                    self.stats["coalesced"] += 1
+                    waiting.append((key, flight))
+                else:
+                    self._inflight[key] = _Flight()
+                    fetch.append(key)
+        return served, fetch, refresh, waiting
+
+    def complete(self, results):
+        # Stores [(key, value)] loaded for plan() and wakes anyone waiting
+        now = time.monotonic()
+        with self._lock:
+            flights = []
+            for key, value in results:
+                self.stats["loads"] += 1
+                self._store(key, value, now)
+                flights.append((self._inflight.pop(key, None), value))
+        for flight, value in flights:
+            if flight is not None:
+                flight.value = value
+                flight.done.set()
+
+    def abandon(self, keys):
+        # Releases keys from plan() that were never loaded (e.g. rate limited)
+        with self._lock:
+            flights = [self._inflight.pop(key, None) for key in keys]
+        for flight in flights:
+            if flight is not None:
+                flight.done.set()
+
+    def note_upstream_call(self, n=1):
+        # Upstream requests made on the cache's behalf; one batch call may
+        # load many keys
+        with self._lock:
+            self.stats["upstream_calls"] += n
+
+    def put(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._store(key, value, now)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._entries)
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["stale"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["stale"]) / lookups, 4) if lookups else 0.0
+        # Keys answered without loading them, and calls saved by loading
+        # several keys per request
+        stats["upstream_saved"] = max(0, lookups - stats["loads"])
+        stats["batch_saved"] = max(0, stats["loads"] - stats["upstream_calls"])
+        return stats
+
+    def _store(self, key, value, now):
+        # Caller holds the lock
+        if value is None:
+            self.stats["errors"] += 1
+            stale = self._entries.get(key)
+            if stale is not None and not stale.error and now < stale.stale_until:
+                # Keep serving the last good value; retry after error_ttl
+                stale.fresh_until = now + self.error_ttl
+                return
+            entry = _Entry(None, now + self.error_ttl, now + self.error_ttl, True)
+        else:
+            entry = _Entry(value, now + self.ttl, now + self.ttl + self.stale_ttl, False)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1